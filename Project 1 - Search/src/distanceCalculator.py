@@ -0,0 +1,465 @@
+# distanceCalculator.py
+# ---------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+This file contains a Distancer object which computes and caches the shortest
+path between any two points in a maze.
+
+Example:
+distancer = Distancer(gameState.data.layout)
+distancer.getDistance( (1,1), (10,10) )
+
+The table is built once per layout, by a breadth first search from every open
+cell, and shared by every Distancer (and so every problem and game) created
+for the same layout in this process.  The searches run over the layout's
+Adjacency (see getAdjacency), the table of legal moves between open cells
+that PositionSearchProblem also uses for its successors.
+
+getDistanceField gives the distance from the nearest of a set of cells to
+every cell in one pass, which is cheaper than one lookup or search per cell
+when a whole field is needed.  TargetDistancer keeps one such field per
+target cell, for callers (like mstFoodHeuristic) that only ever need
+distances to a few fixed targets and so do not need the all-pairs table.
+
+If the PACMAN_DISTANCE_CACHE_DIR environment variable (or DISTANCE_CACHE_DIR
+below) names a directory, tables are also saved there, one file per layout
+keyed by a hash of the layout text.  Later processes memory-map those files
+instead of recomputing them, so parallel workers share the same pages.
+"""
+
+from array import array
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from game import Directions, Actions
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Returned by getDistance for two cells that are not connected
+UNREACHABLE = 0xFFFF
+
+# Layout text -> (cellIds, numCells, distances), see computeDistances
+DISTANCE_MAP_CACHE = {}
+
+# Layout text -> Adjacency
+ADJACENCY_CACHE = {}
+
+# Directory for the on-disk table cache, None disables it
+DISTANCE_CACHE_DIR = os.environ.get('PACMAN_DISTANCE_CACHE_DIR')
+
+# On-disk format, all little-endian: a header (magic, version, width, height,
+# numCells), then width * height int32 cell ids, then numCells ** 2 uint16
+# distances.
+_TABLE_MAGIC = 'PMDT'
+_TABLE_VERSION = 1
+_TABLE_HEADER = struct.Struct('<4sIIII')
+_UINT16 = struct.Struct('<H')
+
+class Distancer:
+    def __init__(self, layout):
+        """
+        Looks up, or computes, the distance table for the given layout.
+        """
+        self.width = layout.width
+        self.height = layout.height
+        self._cellIds, self._numCells, self._distances = getDistanceTable(layout)
+
+    def getDistance(self, pos1, pos2):
+        """
+        Returns the maze distance between two open cells in O(1), or
+        UNREACHABLE if there is no path between them.
+        """
+        id1 = self._cellIds[int(pos1[0]) * self.height + int(pos1[1])]
+        id2 = self._cellIds[int(pos2[0]) * self.height + int(pos2[1])]
+        if id1 < 0 or id2 < 0:
+            raise Exception('Distancer queried with a wall: %s, %s' % (str(pos1), str(pos2)))
+        return self._distances[id1 * self._numCells + id2]
+
+def getDistanceTable(layout):
+    """
+    Returns the (cellIds, numCells, distances) table for a layout, computing
+    it on first use and reusing it for every later request with the same
+    layout text.
+    """
+    key = '\n'.join(layout.layoutText)
+    if key not in DISTANCE_MAP_CACHE:
+        table = None
+        if DISTANCE_CACHE_DIR:
+            path = os.path.join(DISTANCE_CACHE_DIR, hashlib.sha1(key).hexdigest() + '.dist')
+            table = loadDistanceTable(path, layout.width, layout.height)
+        if table is None:
+            table = computeDistances(getAdjacency(layout))
+            if DISTANCE_CACHE_DIR:
+                saveDistanceTable(path, layout.width, layout.height, table)
+        DISTANCE_MAP_CACHE[key] = table
+    return DISTANCE_MAP_CACHE[key]
+
+class MappedDistances:
+    """
+    Read-only, array-like view of the distances in a memory-mapped table file.
+    """
+    def __init__(self, mapped, offset):
+        self._map = mapped
+        self._offset = offset
+
+    def __getitem__(self, index):
+        return _UINT16.unpack_from(self._map, self._offset + 2 * index)[0]
+
+def saveDistanceTable(path, width, height, table):
+    """
+    Writes a (cellIds, numCells, distances) table to path.  The file is
+    written under a temporary name and renamed into place, so a concurrent
+    reader never sees a partial table.  Failures only cost the cache entry.
+    """
+    cellIds, numCells, distances = table
+    cellIds, distances = array('i', cellIds), array('H', distances)
+    if sys.byteorder == 'big':
+        cellIds.byteswap()
+        distances.byteswap()
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        fd, tempPath = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        f = os.fdopen(fd, 'wb')
+        try:
+            f.write(_TABLE_HEADER.pack(_TABLE_MAGIC, _TABLE_VERSION, width, height, numCells))
+            cellIds.tofile(f)
+            distances.tofile(f)
+        finally:
+            f.close()
+        os.chmod(tempPath, 0o644)
+        os.rename(tempPath, path)
+    except (IOError, OSError):
+        pass
+
+def loadDistanceTable(path, width, height):
+    """
+    Memory-maps a table written by saveDistanceTable.  Returns None if the
+    file is missing or does not hold a table for a width x height layout.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        f = open(path, 'rb')
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            f.close()
+    except (IOError, OSError, ValueError):
+        return None
+
+    if len(mapped) < _TABLE_HEADER.size:
+        return None
+    magic, version, fileWidth, fileHeight, numCells = _TABLE_HEADER.unpack_from(mapped, 0)
+    if (magic, version, fileWidth, fileHeight) != (_TABLE_MAGIC, _TABLE_VERSION, width, height):
+        return None
+    offset = _TABLE_HEADER.size + 4 * width * height
+    if len(mapped) != offset + 2 * numCells * numCells:
+        return None
+
+    # the cell id index is small and read on every lookup, so it is copied out
+    cellIds = array('i')
+    cellIds.fromstring(mapped[_TABLE_HEADER.size:offset])
+    if sys.byteorder == 'big':
+        cellIds.byteswap()
+    return cellIds, numCells, MappedDistances(mapped, offset)
+
+class Adjacency:
+    """
+    The legal moves between the open cells of a layout, computed once from
+    its walls.
+
+      cellIds:      x * height + y -> id of the open cell there, -1 for walls.
+                    Open cells are numbered in x-major order, the order of
+                    walls.asList(False).
+      positions:    cell id -> (x,y)
+      neighbors:    cell id -> ids of the adjacent open cells
+      successors:   (x,y) -> list of ((nextx,nexty), action) moves out of it
+      predecessors: (x,y) -> list of ((prevx,prevy), action) moves into it
+
+    Moves are listed in NORTH, SOUTH, EAST, WEST order of their action, the
+    order in which PositionSearchProblem has always generated them.
+    """
+    def __init__(self, walls):
+        self.width, self.height = width, height = walls.width, walls.height
+        self.cellIds = array('i', [-1] * (width * height))
+        self.positions = positions = walls.asList(False)
+        for cell, (x, y) in enumerate(positions):
+            self.cellIds[x * height + y] = cell
+        self.numCells = len(positions)
+
+        self.neighbors = []
+        self.successors = {}
+        self.predecessors = {}
+        for x, y in positions:
+            moves, reverseMoves = [], []
+            for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(action)
+                nextPos = (int(x + dx), int(y + dy))
+                if self._isOpen(nextPos):
+                    moves.append((nextPos, action))
+                prevPos = (int(x - dx), int(y - dy))
+                if self._isOpen(prevPos):
+                    reverseMoves.append((prevPos, action))
+            self.successors[(x, y)] = moves
+            self.predecessors[(x, y)] = reverseMoves
+            self.neighbors.append([self.cellIds[nx * height + ny] for (nx, ny), action in moves])
+
+    def _isOpen(self, pos):
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height and self.cellIds[x * self.height + y] >= 0
+
+def getDistanceField(walls, sources, useNumpy=False):
+    """
+    Returns the maze distance from the nearest of the source positions to
+    every cell of the walls Grid, as a field indexed [x][y].  Walls and cells
+    that no source can reach get UNREACHABLE.
+
+    By default a breadth first search fills in a list of columns.  With
+    useNumpy, the whole wavefront advances one step at a time as boolean
+    array operations and the field is a width x height int32 array.  That
+    is faster on open layouts, but slower on long corridors, where the
+    wavefront stays one cell wide for hundreds of steps.
+    """
+    if useNumpy:
+        if numpy is None:
+            raise Exception, 'useNumpy needs NumPy, which is not installed'
+        return _numpyDistanceField(walls, sources)
+    return _listDistanceField(walls, sources)
+
+def _numpyDistanceField(walls, sources):
+    isOpen = numpy.array([[not walls[x][y] for y in range(walls.height)] for x in range(walls.width)],
+                         dtype=bool)
+    field = numpy.empty(isOpen.shape, dtype=numpy.int32)
+    field.fill(UNREACHABLE)
+    frontier = numpy.zeros(isOpen.shape, dtype=bool)
+    for x, y in sources:
+        frontier[int(x), int(y)] = True
+    frontier &= isOpen
+    field[frontier] = 0
+    unreached = isOpen & ~frontier
+    depth = 0
+    while frontier.any():
+        depth += 1
+        # every open, unreached cell beside the current wavefront
+        spread = numpy.zeros(isOpen.shape, dtype=bool)
+        spread[1:, :] |= frontier[:-1, :]
+        spread[:-1, :] |= frontier[1:, :]
+        spread[:, 1:] |= frontier[:, :-1]
+        spread[:, :-1] |= frontier[:, 1:]
+        frontier = spread & unreached
+        field[frontier] = depth
+        unreached &= ~frontier
+    return field
+
+def _listDistanceField(walls, sources):
+    width, height = walls.width, walls.height
+    field = [[UNREACHABLE] * height for x in range(width)]
+    layer = []
+    for x, y in sources:
+        x, y = int(x), int(y)
+        if not walls[x][y] and field[x][y] != 0:
+            field[x][y] = 0
+            layer.append((x, y))
+    depth = 0
+    while layer:
+        depth += 1
+        nextLayer = []
+        for x, y in layer:
+            for nextx, nexty in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)):
+                if 0 <= nextx < width and 0 <= nexty < height and \
+                   not walls[nextx][nexty] and field[nextx][nexty] == UNREACHABLE:
+                    field[nextx][nexty] = depth
+                    nextLayer.append((nextx, nexty))
+        layer = nextLayer
+    return field
+
+class TargetDistancer:
+    """
+    Maze distances to a fixed set of target cells, from one getDistanceField
+    per target.  Building it costs one breadth first search per target rather
+    than one per open cell, so it suits a few targets on a large layout.
+
+    > distancer = TargetDistancer(walls, foodPositions)
+    > distancer.getDistance(pacmanPosition, foodPositions[0])
+    """
+    def __init__(self, walls, targets, useNumpy=False):
+        self.fields = {}
+        for target in targets:
+            self.fields[target] = getDistanceField(walls, [target], useNumpy)
+
+    def getDistance(self, pos, target):
+        "Returns the maze distance from pos to target, which must be one of the targets"
+        return self.fields[target][int(pos[0])][int(pos[1])]
+
+def getCellId(adjacency, pos):
+    "Returns the cell id of an open (x,y) position"
+    return adjacency.cellIds[int(pos[0]) * adjacency.height + int(pos[1])]
+
+class NearestGoalField:
+    """
+    The maze distance from every open cell to the nearest of a set of goal
+    cells (e.g. the remaining food), kept up to date as goals are removed.
+
+    The field starts as a breadth first search from all of the goals at once.
+    Every cell remembers which goal it is nearest to; removing a goal only
+    recomputes the cells that belonged to it, starting from the distances of
+    the cells around them, so consecutive closest-goal queries reuse all of
+    the work that is still valid.
+
+    > field = NearestGoalField(getAdjacency(layout), food.asList())
+    > path, goal = field.pathToNearestGoal(pacmanPosition)
+    > field.removeGoal(goal)
+    """
+    def __init__(self, adjacency, goals):
+        self.adjacency = adjacency
+        numCells = adjacency.numCells
+        self.distance = array('i', [UNREACHABLE]) * numCells
+        self.owner = array('i', [-1]) * numCells
+        self.goals = set()
+        layer = []
+        for goal in goals:
+            cell = getCellId(adjacency, goal)
+            if cell not in self.goals:
+                self.goals.add(cell)
+                self.distance[cell] = 0
+                self.owner[cell] = cell
+                layer.append(cell)
+        depth = 0
+        while layer:
+            depth += 1
+            nextLayer = []
+            for cell in layer:
+                for neighbor in adjacency.neighbors[cell]:
+                    if self.owner[neighbor] < 0:
+                        self.distance[neighbor] = depth
+                        self.owner[neighbor] = self.owner[cell]
+                        nextLayer.append(neighbor)
+            layer = nextLayer
+
+    def hasGoals(self):
+        return len(self.goals) > 0
+
+    def getDistance(self, pos):
+        "Returns the maze distance from pos to the nearest goal, or UNREACHABLE"
+        return self.distance[getCellId(self.adjacency, pos)]
+
+    def pathToNearestGoal(self, pos):
+        """
+        Returns (actions, goal): a shortest path from pos to the nearest goal
+        and the (x,y) position of that goal.  Among equally near goals, the
+        path prefers NORTH, SOUTH, EAST, WEST in that order at every step.
+        """
+        cell = getCellId(self.adjacency, pos)
+        if self.distance[cell] == UNREACHABLE:
+            raise Exception, 'No goal can be reached from %s' % str(pos)
+        actions = []
+        while self.distance[cell] > 0:
+            position = self.adjacency.positions[cell]
+            for (nextPos, action), neighbor in zip(self.adjacency.successors[position],
+                                                   self.adjacency.neighbors[cell]):
+                if self.distance[neighbor] == self.distance[cell] - 1:
+                    break
+            actions.append(action)
+            cell = neighbor
+        return actions, self.adjacency.positions[cell]
+
+    def removeGoal(self, pos):
+        "Removes the goal at pos and repairs the distances that depended on it"
+        goal = getCellId(self.adjacency, pos)
+        if goal not in self.goals:
+            return
+        self.goals.remove(goal)
+        neighbors, distance, owner = self.adjacency.neighbors, self.distance, self.owner
+
+        # The cells nearest to the removed goal form a connected region around it
+        region = [goal]
+        owner[goal] = -1
+        for cell in region:
+            for neighbor in neighbors[cell]:
+                if owner[neighbor] == goal:
+                    owner[neighbor] = -1
+                    region.append(neighbor)
+
+        # Seed the region from the intact cells bordering it, then spread the
+        # new distances through it in order (Dijkstra with unit steps)
+        frontier = []
+        for cell in region:
+            distance[cell] = UNREACHABLE
+            for neighbor in neighbors[cell]:
+                if owner[neighbor] >= 0 and distance[neighbor] + 1 < distance[cell]:
+                    distance[cell] = distance[neighbor] + 1
+                    owner[cell] = owner[neighbor]
+            if owner[cell] >= 0:
+                heapq.heappush(frontier, (distance[cell], cell))
+        while frontier:
+            depth, cell = heapq.heappop(frontier)
+            if depth > distance[cell]:
+                continue
+            for neighbor in neighbors[cell]:
+                if depth + 1 < distance[neighbor]:
+                    distance[neighbor] = depth + 1
+                    owner[neighbor] = owner[cell]
+                    heapq.heappush(frontier, (depth + 1, neighbor))
+
+def getDistancer(layout):
+    """
+    Returns a Distancer for layout, kept on the layout object so that later
+    calls skip the table lookup, which hashes the whole layout text.
+    """
+    distancer = getattr(layout, 'distancer', None)
+    if distancer is None:
+        distancer = Distancer(layout)
+        layout.distancer = distancer
+    return distancer
+
+def getAdjacency(layout):
+    "Returns the Adjacency of a layout, built on first use and shared afterwards"
+    key = '\n'.join(layout.layoutText)
+    if key not in ADJACENCY_CACHE:
+        ADJACENCY_CACHE[key] = Adjacency(layout.walls)
+    return ADJACENCY_CACHE[key]
+
+def computeDistances(adjacency):
+    """
+    Runs a breadth first search from every open cell of an Adjacency.
+
+    Returns a tuple (cellIds, numCells, distances) where cellIds is the
+    adjacency's cell numbering and distances is a flat array with the
+    distance from cell i to cell j at index i * numCells + j.
+    """
+    numCells, neighbors = adjacency.numCells, adjacency.neighbors
+    distances = array('H', [UNREACHABLE]) * (numCells * numCells)
+    for source in range(numCells):
+        row = source * numCells
+        distances[row + source] = 0
+        layer = [source]
+        depth = 0
+        while layer:
+            depth += 1
+            nextLayer = []
+            for cell in layer:
+                for neighbor in neighbors[cell]:
+                    if distances[row + neighbor] == UNREACHABLE:
+                        distances[row + neighbor] = depth
+                        nextLayer.append(neighbor)
+            layer = nextLayer
+    return adjacency.cellIds, numCells, distances
@@ -14,6 +14,11 @@
 
 import search
 import random
+from array import array
+import collections
+import os
+import struct
+import tempfile
 
 # Module Classes
 
@@ -145,6 +150,20 @@ class EightPuzzleState:
 
         return newPuzzle
 
+    def tilePositions( self ):
+        """
+          Returns a list whose i'th entry is the cell holding tile i, with
+        cells numbered 0 to 8 row by row (the blank is tile 0).
+
+        >>> EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).tilePositions()
+        [1, 0, 2, 3, 4, 5, 6, 7, 8]
+        """
+        positions = [0] * 9
+        for row in range( 3 ):
+            for col in range( 3 ):
+                positions[self.cells[row][col]] = row * 3 + col
+        return positions
+
     # Utilities for comparison and display
     def __eq__(self, other):
         """
@@ -183,20 +202,115 @@ class EightPuzzleState:
     def __str__(self):
         return self.__getAsciiString()
 
+# Cell the blank moves to for each move, by blank cell; only legal moves
+_MOVE_TARGETS = []
+for _cell in range(9):
+    _row, _col = _cell // 3, _cell % 3
+    _targets = []
+    if _row != 0: _targets.append(('up', _cell - 3))
+    if _row != 2: _targets.append(('down', _cell + 3))
+    if _col != 0: _targets.append(('left', _cell - 1))
+    if _col != 2: _targets.append(('right', _cell + 1))
+    _MOVE_TARGETS.append(dict(_targets))
+_LEGAL_MOVES = [[move for move in ['up', 'down', 'left', 'right'] if move in targets]
+                for targets in _MOVE_TARGETS]
+
+class PackedEightPuzzleState(object):
+    """
+    An eight puzzle with the same interface as EightPuzzleState, stored as a
+    single integer: 4 bits per cell holding its tile (cell i in bits 4i to
+    4i+3, cells numbered row by row), and the cell of the blank in bits 36
+    and up.  Moves, hashing, equality and the goal test are a few integer
+    operations, and a state takes a fraction of the memory.
+
+    >>> PackedEightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left').isGoal()
+    True
+    """
+    __slots__ = ('packed',)
+
+    def __init__(self, numbers):
+        "numbers: the tiles cell by cell, as for EightPuzzleState"
+        packed = 0
+        for cell, tile in enumerate(numbers):
+            packed |= tile << (4 * cell)
+        self.packed = packed | numbers.index(0) << 36
+
+    def isGoal(self):
+        return self.packed == _PACKED_GOAL
+
+    def legalMoves(self):
+        """
+        Returns a list of legal moves from the current state.
+
+        >>> PackedEightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8]).legalMoves()
+        ['down', 'right']
+        """
+        return _LEGAL_MOVES[self.packed >> 36]
+
+    def result(self, move):
+        "Returns a new state with the blank moved; this state is unchanged"
+        blank = self.packed >> 36
+        target = _MOVE_TARGETS[blank][move]
+        tiles = self.packed & _TILE_MASK
+        tile = (tiles >> (4 * target)) & 15
+        newPuzzle = PackedEightPuzzleState.__new__(PackedEightPuzzleState)
+        newPuzzle.packed = (tiles ^ (tile << (4 * target)) ^ (tile << (4 * blank))) | target << 36
+        return newPuzzle
+
+    def numbers(self):
+        "Returns the tiles cell by cell"
+        return [(self.packed >> (4 * cell)) & 15 for cell in range(9)]
+
+    def tilePositions(self):
+        "Returns a list whose i'th entry is the cell holding tile i"
+        positions = [0] * 9
+        for cell in range(9):
+            positions[(self.packed >> (4 * cell)) & 15] = cell
+        return positions
+
+    def _getBlankLocation(self):
+        return divmod(self.packed >> 36, 3)
+    blankLocation = property(_getBlankLocation)
+
+    def _getCells(self):
+        numbers = self.numbers()
+        return [numbers[0:3], numbers[3:6], numbers[6:9]]
+    cells = property(_getCells)
+
+    def __eq__(self, other):
+        return isinstance(other, PackedEightPuzzleState) and self.packed == other.packed
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.packed)
+
+    def __str__(self):
+        return str(EightPuzzleState(self.numbers()))
+
+_TILE_MASK = (1 << 36) - 1
+_PACKED_GOAL = PackedEightPuzzleState(range(9)).packed
+
+def packEightPuzzle(puzzle):
+    "Returns a PackedEightPuzzleState equal to the EightPuzzleState puzzle"
+    return PackedEightPuzzleState([tile for row in puzzle.cells for tile in row])
+
 # TODO: Implement The methods in this class
 
 class EightPuzzleSearchProblem(search.SearchProblem):
     """
       Implementation of a SearchProblem for the  Eight Puzzle domain
 
-      Each state is represented by an instance of an eightPuzzle.
+      Each state is represented by an instance of an eightPuzzle, either an
+      EightPuzzleState or a PackedEightPuzzleState (see packEightPuzzle).
     """
     def __init__(self,puzzle):
         "Creates a new EightPuzzleSearchProblem which stores search information."
         self.puzzle = puzzle
 
     def getStartState(self):
-        return puzzle
+        return self.puzzle
 
     def isGoalState(self,state):
         return state.isGoal()
@@ -221,6 +335,204 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         """
         return len(actions)
 
+# Pattern database heuristic
+
+# Disjoint groups of tiles, one pattern database each
+PATTERN_GROUPS = ((1, 2, 3, 4), (5, 6, 7, 8))
+
+# File to load the pattern databases from, or save them to after building
+# them; None keeps them in memory only
+PATTERN_DATABASE_FILE = os.environ.get('PACMAN_PATTERN_DATABASE')
+
+_PATTERN_DATABASES = None
+
+# On-disk format: a header (magic, version, number of groups), then for every
+# group its size, its tiles and its 9 ** (size + 1) table of uint8 costs.
+_PDB_MAGIC = 'EPDB'
+_PDB_VERSION = 2
+_PDB_HEADER = struct.Struct('<4sII')
+
+# Cells next to each cell of the board, cells numbered row by row
+_ADJACENT_CELLS = [[r * 3 + c for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+                    if 0 <= r < 3 and 0 <= c < 3]
+                   for row in range(3) for col in range(3)]
+
+def patternDatabaseHeuristic(state, problem=None):
+    """
+      An admissible, consistent heuristic for the EightPuzzleSearchProblem:
+    the sum, over the disjoint tile groups in PATTERN_GROUPS, of the fewest
+    moves of that group's tiles needed to bring them home from where they
+    and the blank are.  Every move moves a single tile and changes the cost
+    of its own group by at most one, so the group costs add up without
+    overestimating and without dropping by more than one per move.
+
+    >>> patternDatabaseHeuristic(EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]))
+    1
+    """
+    positions = state.tilePositions()
+    total = 0
+    for tiles, table in getPatternDatabases():
+        index = 0
+        for tile in reversed(tiles):
+            index = index * 9 + positions[tile]
+        total += table[index * 9 + positions[0]]
+    return total
+
+def getPatternDatabases():
+    """
+      Returns the pattern databases as a list of (tiles, table) pairs, where
+    table[index] is the cost of the placement of the blank and the tiles
+    given by index (the cells of the blank and then of each tile as a base 9
+    number, the blank least significant).
+    They are loaded from, or built and saved to, PATTERN_DATABASE_FILE.
+    """
+    global _PATTERN_DATABASES
+    if _PATTERN_DATABASES is None:
+        databases = None
+        if PATTERN_DATABASE_FILE:
+            databases = loadPatternDatabases(PATTERN_DATABASE_FILE)
+        if databases is None:
+            databases = [(tiles, buildPatternDatabase(tiles)) for tiles in PATTERN_GROUPS]
+            if PATTERN_DATABASE_FILE:
+                savePatternDatabases(PATTERN_DATABASE_FILE, databases)
+        _PATTERN_DATABASES = databases
+    return _PATTERN_DATABASES
+
+def buildPatternDatabase(tiles):
+    """
+      Searches backwards from the goal over placements of the blank and the
+    given tiles, where moving one of the tiles costs 1 and moving any other
+    tile is free (a breadth first search with a deque, free moves going to
+    the front).  Returns the cheapest cost of every placement of the blank
+    and the tiles, indexed as in getPatternDatabases.  Placements that
+    cannot happen (two pieces in one cell) are left at 255.
+    """
+    size = len(tiles)
+    table = array('B', [255]) * (9 ** (size + 1))
+    start = (0, tuple(tiles))   # the blank, then each tile, at its goal cell
+    costs = {start: 0}
+    queue = collections.deque([start])
+    while queue:
+        placement = queue.popleft()
+        blank, cells = placement
+        cost = costs[placement]
+        index = 0
+        for cell in reversed(cells):
+            index = index * 9 + cell
+        index = index * 9 + blank
+        table[index] = min(table[index], cost)
+        for nextBlank in _ADJACENT_CELLS[blank]:
+            if nextBlank in cells:
+                # one of the tiles slides into the blank
+                nextCells = tuple([blank if cell == nextBlank else cell for cell in cells])
+                nextPlacement, step = (nextBlank, nextCells), 1
+            else:
+                nextPlacement, step = (nextBlank, cells), 0
+            if nextPlacement not in costs or cost + step < costs[nextPlacement]:
+                costs[nextPlacement] = cost + step
+                if step == 0:
+                    queue.appendleft(nextPlacement)
+                else:
+                    queue.append(nextPlacement)
+    return table
+
+def savePatternDatabases(path, databases):
+    """
+      Writes pattern databases to path, under a temporary name first so that
+    readers never see a partial file.  Failures only cost the saved copy.
+    """
+    try:
+        fd, tempPath = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        f = os.fdopen(fd, 'wb')
+        try:
+            f.write(_PDB_HEADER.pack(_PDB_MAGIC, _PDB_VERSION, len(databases)))
+            for tiles, table in databases:
+                f.write(struct.pack('<B%dB' % len(tiles), len(tiles), *tiles))
+                table.tofile(f)
+        finally:
+            f.close()
+        os.chmod(tempPath, 0o644)
+        os.rename(tempPath, path)
+    except (IOError, OSError):
+        pass
+
+def loadPatternDatabases(path):
+    """
+      Reads pattern databases written by savePatternDatabases.  Returns None
+    if the file is missing or holds databases for other tile groups.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        f = open(path, 'rb')
+        try:
+            data = f.read()
+        finally:
+            f.close()
+    except IOError:
+        return None
+    try:
+        magic, version, numGroups = _PDB_HEADER.unpack_from(data, 0)
+        if (magic, version) != (_PDB_MAGIC, _PDB_VERSION):
+            return None
+        offset = _PDB_HEADER.size
+        databases = []
+        for group in range(numGroups):
+            size = ord(data[offset])
+            tiles = struct.unpack_from('<%dB' % size, data, offset + 1)
+            offset += 1 + size
+            table = array('B')
+            table.fromstring(data[offset:offset + 9 ** (size + 1)])
+            offset += 9 ** (size + 1)
+            databases.append((tiles, table))
+    except (struct.error, IndexError):
+        return None
+    if offset != len(data) or [tuple(tiles) for tiles, table in databases] != list(PATTERN_GROUPS):
+        return None
+    return databases
+
+def checkPatternDatabaseHeuristic():
+    """
+      Compares patternDatabaseHeuristic with the exact distance to the goal,
+    found by a breadth first search from it, on every solvable puzzle.
+    Returns the number of puzzles where the heuristic overestimates plus the
+    number of moves where it drops by more than one; 0 means it is admissible
+    and consistent.  Takes a few seconds.
+
+    >>> checkPatternDatabaseHeuristic()
+    0
+    """
+    goal = tuple(range(9))
+    distances = {goal: 0}
+    layer = [goal]
+    while layer:
+        nextLayer = []
+        for numbers in layer:
+            blank = numbers.index(0)
+            for cell in _ADJACENT_CELLS[blank]:
+                moved = list(numbers)
+                moved[blank], moved[cell] = moved[cell], 0
+                moved = tuple(moved)
+                if moved not in distances:
+                    distances[moved] = distances[numbers] + 1
+                    nextLayer.append(moved)
+        layer = nextLayer
+
+    heuristic = {}
+    for numbers in distances:
+        heuristic[numbers] = patternDatabaseHeuristic(PackedEightPuzzleState(numbers))
+    problems = 0
+    for numbers, distance in distances.items():
+        if heuristic[numbers] > distance:
+            problems += 1
+        blank = numbers.index(0)
+        for cell in _ADJACENT_CELLS[blank]:
+            moved = list(numbers)
+            moved[blank], moved[cell] = moved[cell], 0
+            if heuristic[numbers] > heuristic[tuple(moved)] + 1:
+                problems += 1
+    return problems
+
 EIGHT_PUZZLE_DATA = [[1, 0, 2, 3, 4, 5, 6, 7, 8],
                      [1, 7, 8, 2, 3, 4, 5, 6, 0],
                      [4, 3, 2, 7, 0, 5, 1, 6, 8],
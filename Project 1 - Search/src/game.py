@@ -190,6 +190,7 @@ class Grid:
 
     def __eq__(self, other):
         if other == None: return False
+        if isinstance(other, BitGrid): return other == self
         return self.data == other.data
 
     def __hash__(self):
@@ -274,6 +275,132 @@ class Grid:
                 bools.append(False)
         return bools
 
+class BitGrid(Grid):
+    """
+    A Grid of booleans packed into the bits of a single integer, with the
+    same grid[x][y] interface as Grid.  Cell (x,y) is bit x * height + y.
+
+    Counting, listing and hashing work on the integer as a whole rather than
+    cell by cell, and since integers are immutable, copy() just shares the
+    bits: a write replaces the copy's integer and leaves every other copy
+    alone.  That makes BitGrid a good fit for food, which every game state
+    copies, hashes and counts; reading a single cell is a little slower than
+    with Grid, which is why walls stay in a Grid.
+    """
+    def __init__(self, width, height, initialValue=False, bitRepresentation=None):
+        if initialValue not in [False, True]: raise Exception('Grids can only contain booleans')
+        self.CELLS_PER_INT = 30
+
+        self.width = width
+        self.height = height
+        self.bits = 0
+        if initialValue:
+            self.bits = (1 << (width * height)) - 1
+        self._hash = None
+        if bitRepresentation:
+            self._unpackBits(bitRepresentation)
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.width:
+            if not -self.width <= i < 0: raise IndexError('grid index out of range')
+            i += self.width
+        return _BitColumn(self, i)
+
+    def __setitem__(self, key, item):
+        column = self[key]
+        for y in range(self.height):
+            column[y] = item[y]
+
+    def __str__(self):
+        out = [[str(self[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __eq__(self, other):
+        if other == None: return False
+        if isinstance(other, BitGrid):
+            return self.bits == other.bits and self.height == other.height and self.width == other.width
+        return [list(self[x]) for x in range(self.width)] == other.data
+
+    def __hash__(self):
+        # The same value Grid.__hash__ gives for the same cells
+        if self._hash == None:
+            self._hash = hash(self.bits)
+        return self._hash
+
+    def copy(self):
+        g = BitGrid(self.width, self.height)
+        g.bits = self.bits
+        g._hash = self._hash
+        return g
+
+    def deepCopy(self):
+        return self.copy()
+
+    def shallowCopy(self):
+        return self.copy()
+
+    def count(self, item =True ):
+        trueCount = bin(self.bits).count('1')
+        if item:
+            return trueCount
+        return self.width * self.height - trueCount
+
+    def asList(self, key = True):
+        height = self.height
+        return [(i // height, i % height) for i, bit in enumerate(self._digits(key)) if bit == '1']
+
+    def iterList(self, key = True):
+        """
+        Yields the (x,y) positions whose value is key, in the same order as
+        asList, jumping straight from one to the next.
+        """
+        digits = self._digits(key)
+        index = digits.find('1')
+        while index >= 0:
+            yield divmod(index, self.height)
+            index = digits.find('1', index + 1)
+
+    def _digits(self, key):
+        "The cells as a string of '0's and '1's (for key), with cell i at index i"
+        bits = self.bits
+        if not key:
+            bits = ~bits & ((1 << (self.width * self.height)) - 1)
+        # bin() puts the most significant bit first
+        return bin(bits)[:1:-1]
+
+    def _setBit(self, index, value):
+        if value:
+            self.bits |= 1 << index
+        else:
+            self.bits &= ~(1 << index)
+        self._hash = None
+
+class _BitColumn(object):
+    "Column x of a BitGrid, so that grid[x][y] reads and writes its bits"
+    __slots__ = ('grid', 'offset')
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.offset = x * grid.height
+
+    def __getitem__(self, y):
+        height = self.grid.height
+        if not 0 <= y < height:
+            if not -height <= y < 0: raise IndexError('grid index out of range')
+            y += height
+        return bool((self.grid.bits >> (self.offset + y)) & 1)
+
+    def __setitem__(self, y, value):
+        height = self.grid.height
+        if not 0 <= y < height:
+            if not -height <= y < 0: raise IndexError('grid index out of range')
+            y += height
+        self.grid._setBit(self.offset + y, value)
+
+    def __len__(self):
+        return self.grid.height
+
 def reconstituteGrid(bitRep):
     if type(bitRep) is not type((1,2)):
         return bitRep
@@ -15,9 +15,14 @@
 """
 In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
+
+Search functions with a 'stats' argument record their frontier operations into
+it; see searchStats.py for running any search with full statistics.
 """
 
+import time
 import util
+import searchStats
 
 class SearchProblem:
     """
@@ -73,54 +78,100 @@ def tinyMazeSearch(problem):
     return [s, s, w, s, w, w, s, w]
 
 
-def dfs_bfs(problem, data_structure):
-    visited_set = set()
-
-    # grab the start node
-    # nodes are tuples of (x, y)
-    start_node = problem.getStartState()
-
-    # insert tuple of start node and an array containing the path it took to get there
-    # the path array will be a list of directions
-    # ex: ['North', 'West', 'East', 'South']
-    node_tuple = (start_node, [])
-    data_structure.push(node_tuple)
-
-    # begin algorithm, continue as long as there is a node in the data structure
-    while not data_structure.isEmpty():
-        # grab the node and the path it took to get there from the top of the stack
-        popped_tuple = data_structure.pop()
-        node = popped_tuple[0]
-        path = popped_tuple[1]
+class SearchNode(object):
+    """
+    A node in the search tree.
 
-        # check if the node has been visited yet
-        if node in visited_set:
-            # skip this iteration of the loop
+    Rather than carrying a copy of every action taken to reach it, a node only
+    stores the action that led to it from its parent.  The full plan is
+    rebuilt by following the parent pointers once a goal has been found, so
+    pushing a node costs the same no matter how deep it is.
+    """
+    __slots__ = ('state', 'parent', 'action', 'cost')
+
+    def __init__(self, state, parent=None, action=None, cost=0):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.cost = cost
+
+    def child(self, state, action, stepCost):
+        "Returns the node reached by taking 'action' from this node."
+        return SearchNode(state, self, action, self.cost + stepCost)
+
+    def path(self):
+        "Returns the list of actions leading from the root to this node."
+        actions = []
+        node = self
+        while node.parent is not None:
+            actions.append(node.action)
+            node = node.parent
+        actions.reverse()
+        return actions
+
+
+def graphSearch(problem, frontier, priority=None, expand=None, stats=None):
+    """
+    The graph search loop shared by depthFirstSearch, breadthFirstSearch,
+    uniformCostSearch, aStarSearch and jumpPointSearch.  The frontier decides
+    the order of expansion:
+
+      util.Stack or util.Queue: nodes are pushed as they are generated and
+      expanded last-in-first-out or first-in-first-out; priority is None.
+
+      util.IndexedPriorityQueue keyed by node.state: priority(state, cost)
+      gives the priority of a node reaching state at the given path cost,
+      e.g. the cost itself for uniform cost search or cost + h for A*.
+
+    Duplicates are handled the same way for every frontier.  A state is
+    expanded at most once, the first time a node for it is popped, and
+    successors that are already expanded are dropped.  On a priority frontier
+    a successor is also dropped unless it is cheaper than every path to its
+    state generated so far, in which case it replaces the queued node.
+
+    expand(node) returns the successor triples of a node, by default
+    problem.getSuccessors(node.state).  Returns the actions of the first goal
+    node popped, or None if the frontier runs out.
+    """
+    frontier = searchStats.instrumentFrontier(frontier, stats)
+    closed = set()
+    bestCost = {}
+    isGoalState = problem.isGoalState
+    if expand is None:
+        getSuccessors = problem.getSuccessors
+        expand = lambda node: getSuccessors(node.state)
+
+    startState = problem.getStartState()
+    if priority is None:
+        frontier.push(SearchNode(startState))
+    else:
+        bestCost[startState] = 0
+        frontier.push(SearchNode(startState), priority(startState, 0))
+
+    while not frontier.isEmpty():
+        node = frontier.pop()
+        state = node.state
+        if state in closed:
             continue
-
-        # check if we've reached the end node
-        if problem.isGoalState(node):
-            # success, return the path it took to get here
-            return path
-
-        # mark the current node as visited
-        visited_set.add(node)
-
-        # grab the all neighbors for the current node
-        neighbors = problem.getSuccessors(node)
-        for neighbor in neighbors:
-            # a node is in the format ((x, y), 'Direction', Cost)
-            next_node = neighbor[0]
-            direction = neighbor[1]
-
-            # check if the next node has not been visited yet
-            if next_node not in visited_set:
-                # add the next node to the data structure plus the path it took to get to it
-                next_node_tuple = (next_node, path + [direction])
-                data_structure.push(next_node_tuple)
-
-
-def depthFirstSearch(problem):
+        if isGoalState(state):
+            return node.path()
+        closed.add(state)
+
+        for nextState, action, stepCost in expand(node):
+            if nextState in closed:
+                continue
+            if priority is None:
+                frontier.push(node.child(nextState, action, stepCost))
+                continue
+            nextCost = node.cost + stepCost
+            if nextState in bestCost and bestCost[nextState] <= nextCost:
+                continue
+            bestCost[nextState] = nextCost
+            frontier.push(node.child(nextState, action, stepCost), priority(nextState, nextCost))
+    return None
+
+
+def depthFirstSearch(problem, stats=None):
     """
     Search the deepest nodes in the search tree first.
 
@@ -135,126 +186,458 @@ def depthFirstSearch(problem):
     print "Start's successors:", problem.getSuccessors(problem.getStartState())
     """
     # DFS uses a stack
-    return dfs_bfs(problem, util.Stack())
+    return graphSearch(problem, util.Stack(), stats=stats)
 
 
-def breadthFirstSearch(problem):
+def breadthFirstSearch(problem, stats=None):
     """Search the shallowest nodes in the search tree first."""
     # BFS uses a queue
-    return dfs_bfs(problem, util.Queue())
+    return graphSearch(problem, util.Queue(), stats=stats)
 
 
-def uniformCostSearch(problem):
+def uniformCostSearch(problem, stats=None):
     """Search the node of least total cost first."""
-    # initialize data structures
-    priority_queue = util.PriorityQueue()
-    visited_set = set()
+    # the frontier is indexed by state so an improved cost is a decrease-key, not a second entry
+    frontier = util.IndexedPriorityQueue(key=lambda node: node.state)
+    return graphSearch(problem, frontier, lambda state, cost: cost, stats=stats)
 
-    # dictionary to keep track of the highest priority/lowest cost of each node
-    weights = {}
 
-    # grab the start node
-    # nodes are tuples of (x, y)
-    start_node = problem.getStartState()
+def nullHeuristic(state, problem=None):
+    """
+    A heuristic function estimates the cost from the current state to the nearest
+    goal in the provided SearchProblem.  This heuristic is trivial.
+    """
+    return 0
 
-    # give the first node a weight of 0
-    weights[start_node] = 0
 
-    # create tuple of start node and an array containing the path it took to get there
-    # the path array will be a list of directions
-    # ex: ['North', 'West', 'East', 'South']
-    node_tuple = (start_node, [])
+def aStarSearch(problem, heuristic=nullHeuristic, cacheHeuristic=False, weight=1, stats=None):
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+    A weight above 1 multiplies the heuristic (see weightedAStarSearch).
+
+    The cheapest known cost of every generated state is remembered, and a
+    successor is only pushed when it improves on that cost, so dominated
+    duplicates never reach the heap and never have their heuristic evaluated.
+    With cacheHeuristic=True each state's heuristic value is also computed at
+    most once, which pays off for expensive heuristics such as foodHeuristic.
+    """
+    "* YOUR CODE HERE *"
+    # heuristic values already computed, only filled in when cacheHeuristic is set
+    heuristicCache = {}
+
+    # the heuristic is only evaluated for successors that go on the heap
+    def priority(state, cost):
+        if state in heuristicCache:
+            return cost + weight * heuristicCache[state]
+        stateHeuristic = heuristic(state, problem)
+        if cacheHeuristic:
+            heuristicCache[state] = stateHeuristic
+        return cost + weight * stateHeuristic
+
+    # open set, indexed by state so a cheaper path to a queued state replaces the old entry
+    openSet = util.IndexedPriorityQueue(key=lambda node: node.state)
+    path = graphSearch(problem, openSet, priority, stats=stats)
+    # if the openSet runs out it is a failure, return 0
+    if path is None:
+        return 0
+    return path
 
-    # push the tuple and initial weight of 0 into the priority queue
-    priority_queue.push(node_tuple, 0)
 
-    # begin algorithm, continue as long as there is a node in the priority queue
-    while not priority_queue.isEmpty():
-        popped_tuple = priority_queue.pop()
-        node = popped_tuple[0]
-        path = popped_tuple[1]
+def weightedAStarSearch(problem, heuristic=nullHeuristic, weight=2, stats=None):
+    """
+    A* with the heuristic multiplied by weight (> 1).  This trusts the
+    heuristic more, usually expanding far fewer nodes, and with a consistent
+    heuristic the path returned costs at most weight times the optimum.
+    """
+    return aStarSearch(problem, heuristic, weight=weight, stats=stats)
 
-        # check if the node has been visited yet
-        if node in visited_set:
-            # skip this iteration of the loop
-            continue
 
-        # check if we've reached the end node
-        if problem.isGoalState(node):
-            # success, return the path it took to get here
-            return path
+def beamSearch(problem, heuristic=nullHeuristic, width=10):
+    """
+    Breadth first search that only keeps the 'width' most promising nodes
+    (lowest cost plus heuristic) of every layer.  Time and memory are bounded
+    by the width, but the path may be far from optimal and the search can
+    fail to find a path at all, in which case None is returned.
+    """
+    start_state = problem.getStartState()
+    if problem.isGoalState(start_state):
+        return []
+
+    visited_set = set([start_state])
+    beam = [SearchNode(start_state)]
+    while beam:
+        # generate the whole next layer, remembering the order for ties
+        candidates = []
+        for node in beam:
+            for next_state, direction, step_cost in problem.getSuccessors(node.state):
+                if next_state in visited_set:
+                    continue
+                next_node = node.child(next_state, direction, step_cost)
+                if problem.isGoalState(next_state):
+                    return next_node.path()
+                visited_set.add(next_state)
+                estimate = next_node.cost + heuristic(next_state, problem)
+                candidates.append((estimate, len(candidates), next_node))
+
+        # and keep only the best of it
+        candidates.sort()
+        beam = [node for _, _, node in candidates[:width]]
+    return None
 
-        # mark the current node as visited, and grab the weight associated to it
-        visited_set.add(node)
-        cost = weights[node]
-
-        # grab the all neighbors for the current node
-        neighbors = problem.getSuccessors(node)
-        for neighbor in neighbors:
-            # a node is in the format ((x, y), 'Direction', Cost)
-            next_node = neighbor[0]
-            direction = neighbor[1]
-            next_cost = neighbor[2]
-
-            # create a tuple for the next node containing the node and the path it took to get to it
-            next_node_tuple = (next_node, path + [direction])
-
-            # check if the next node's weight has been previously calculated
-            if next_node in weights:
-                # check if this new cost for next node is better than the previously calculated one
-                if weights[next_node] <= cost + next_cost:
+
+def anytimeRepairingAStarSolutions(problem, heuristic=nullHeuristic, weight=3, weightStep=0.5, deadline=None, stats=None):
+    """
+    Anytime repairing A* (ARA*).  This generator yields (path, weight) every
+    time it finds a cheaper path.
+
+    The first search is weighted A* with the given weight.  After each
+    solution the weight is lowered by weightStep, and the next search reuses
+    the costs already found. It only re-expands states whose cost improved
+    since they were expanded. The last solution, found with weight 1, is
+    optimal for an admissible heuristic.
+
+    Once a first path has been yielded the generator stops at 'deadline' (a
+    time.time() value), if one is given; the first path is always yielded.
+    """
+    heuristic_cache = {}
+    def estimate(state):
+        if state not in heuristic_cache:
+            heuristic_cache[state] = heuristic(state, problem)
+        return heuristic_cache[state]
+
+    start_state = problem.getStartState()
+    nodes = {start_state: SearchNode(start_state)}
+    goal_node = None
+    if problem.isGoalState(start_state):
+        goal_node = nodes[start_state]
+
+    open_set = searchStats.instrumentFrontier(util.IndexedPriorityQueue(key=lambda node: node.state), stats)
+    open_set.push(nodes[start_state], weight * estimate(start_state))
+    closed_set = set()
+    # states whose cost improved after they were expanded in this iteration
+    inconsistent = set()
+    yielded_cost = None
+
+    while True:
+        # expand until nothing left on the open set can lead to a cheaper goal
+        while not open_set.isEmpty() and (goal_node is None or open_set.minPriority() < goal_node.cost):
+            if yielded_cost is not None and deadline is not None and time.time() > deadline:
+                return
+            node = open_set.pop()
+            closed_set.add(node.state)
+            for next_state, direction, step_cost in problem.getSuccessors(node.state):
+                next_cost = node.cost + step_cost
+                if next_state in nodes and nodes[next_state].cost <= next_cost:
                     continue
+                next_node = node.child(next_state, direction, step_cost)
+                nodes[next_state] = next_node
+                if problem.isGoalState(next_state) and (goal_node is None or next_cost < goal_node.cost):
+                    goal_node = next_node
+                if next_state in closed_set:
+                    inconsistent.add(next_state)
                 else:
-                    priority_queue.update(next_node_tuple, cost + next_cost)
-            else:
-                priority_queue.push(next_node_tuple, cost + next_cost)
+                    open_set.push(next_node, next_cost + weight * estimate(next_state))
+
+        # the open set ran dry without reaching a goal
+        if goal_node is None:
+            return
+        if yielded_cost is None or goal_node.cost < yielded_cost:
+            yielded_cost = goal_node.cost
+            yield goal_node.path(), weight
+
+        if weight <= 1 or (deadline is not None and time.time() > deadline):
+            return
+
+        # lower the weight, and queue the open and inconsistent states again with their new priorities
+        weight = max(1, weight - weightStep)
+        states = inconsistent
+        while not open_set.isEmpty():
+            states.add(open_set.pop().state)
+        for state in states:
+            open_set.push(nodes[state], nodes[state].cost + weight * estimate(state))
+        inconsistent = set()
+        closed_set = set()
+
+
+def anytimeRepairingAStarSearch(problem, heuristic=nullHeuristic, weight=3, weightStep=0.5, timeLimit=1.0, stats=None):
+    """
+    Returns the best path anytimeRepairingAStarSolutions finds in timeLimit
+    seconds.  The first path is always completed, even if that takes longer.
+    """
+    best_path = None
+    for path, path_weight in anytimeRepairingAStarSolutions(problem, heuristic, weight, weightStep,
+                                                             time.time() + timeLimit, stats):
+        best_path = path
+    return best_path
 
-            # update the weight of the next node in the dictionary if we got to this point
-            weights[next_node] = cost + next_cost
 
+def iterativeDeepeningSearch(problem):
+    """
+    Run depth limited searches with a growing depth limit, returning a path
+    with the fewest actions.
 
-def nullHeuristic(state, problem=None):
+    Only the current path is kept in memory, so this is a linear memory
+    alternative to breadthFirstSearch at the price of expanding the shallow
+    nodes again on every iteration.
     """
-    A heuristic function estimates the cost from the current state to the nearest
-    goal in the provided SearchProblem.  This heuristic is trivial.
+    return _iterativeDeepening(problem, nullHeuristic, False)
+
+
+def idaStarSearch(problem, heuristic=nullHeuristic):
     """
-    return 0
+    Iterative deepening A*: repeated depth first searches that prune every
+    node whose cost plus heuristic exceeds a bound, raising the bound to the
+    smallest pruned value each time.  With an admissible heuristic it returns
+    a least cost path like aStarSearch while using memory linear in the path
+    length.
+    """
+    return _iterativeDeepening(problem, heuristic, True)
 
 
-def aStarSearch(problem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
-    "* YOUR CODE HERE *"
-    # open set
-    openSet = util.PriorityQueue()
+def _iterativeDeepening(problem, heuristic, use_step_costs):
+    # the first bound is the estimate for the start state itself
+    bound = heuristic(problem.getStartState(), problem)
+    while True:
+        path, bound = _boundedDepthFirstSearch(problem, bound, heuristic, use_step_costs)
+        if path is not None:
+            return path
+        # nothing was pruned, so the whole reachable space was searched
+        if bound is None:
+            return None
+
 
-    # closed set
-    closedSet = set()
+def _boundedDepthFirstSearch(problem, bound, heuristic, use_step_costs):
+    """
+    Depth first search over paths that never visits a node whose cost plus
+    heuristic is above bound.  When use_step_costs is False every action
+    costs 1, so the bound is a depth limit.
 
-    # insert initial node with lowest cost in openSet aka "fringe"
-    openSet.push((problem.getStartState(), [], 0), heuristic(problem.getStartState(), problem))
+    Returns (path, None) when a goal is found, and otherwise (None, the
+    smallest value that was pruned), or (None, None) if nothing was pruned.
+    """
+    start_state = problem.getStartState()
+    estimate = heuristic(start_state, problem)
+    if estimate > bound:
+        return None, estimate
+    if problem.isGoalState(start_state):
+        return [], None
+
+    # only the current path is stored: its actions, its states, and for every
+    # state on it the cost so far and the successors still left to try
+    actions = []
+    on_path = set([start_state])
+    stack = [(start_state, 0, iter(problem.getSuccessors(start_state)))]
+    next_bound = None
+
+    while stack:
+        state, cost, successors = stack[-1]
+        for next_state, direction, step_cost in successors:
+            # don't walk around in circles on the current path
+            if next_state in on_path:
+                continue
+
+            if use_step_costs:
+                next_cost = cost + step_cost
+            else:
+                next_cost = cost + 1
+            estimate = next_cost + heuristic(next_state, problem)
+
+            # prune, but remember how far the bound would have to grow
+            if estimate > bound:
+                if next_bound is None or estimate < next_bound:
+                    next_bound = estimate
+                continue
+
+            actions.append(direction)
+            if problem.isGoalState(next_state):
+                return actions, None
+
+            # go one level deeper
+            on_path.add(next_state)
+            stack.append((next_state, next_cost, iter(problem.getSuccessors(next_state))))
+            break
+        else:
+            # every successor of this state has been tried, backtrack
+            stack.pop()
+            on_path.discard(state)
+            if actions:
+                actions.pop()
+
+    return None, next_bound
+
+
+def bidirectionalBreadthFirstSearch(problem):
+    """
+    Search outwards from both the start and the goal until the two searches
+    meet, returning a path with the fewest actions.
+
+    The problem must have a single goal, returned by getGoalState(), and a
+    getPredecessors(state) method that returns (predecessor, action, stepCost)
+    triples, where 'action' leads from the predecessor to 'state'.  Each step
+    grows whichever frontier is smaller by one full layer, so a point-to-point
+    query expands roughly the square root of what breadthFirstSearch does.
+    """
+    start_state = problem.getStartState()
+    goal_state = problem.getGoalState()
+    if problem.isGoalState(start_state):
+        return []
+
+    # the best node found so far for every state reached from each side
+    forward_nodes = {start_state: SearchNode(start_state)}
+    backward_nodes = {goal_state: SearchNode(goal_state)}
+    forward_layer = [forward_nodes[start_state]]
+    backward_layer = [backward_nodes[goal_state]]
+
+    while forward_layer and backward_layer:
+        # grow the smaller of the two frontiers by one layer
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meeting = _expandLayer(forward_layer, forward_nodes, backward_nodes, problem.getSuccessors)
+            if meeting is not None:
+                return _joinPaths(meeting[0], meeting[1])
+        else:
+            backward_layer, meeting = _expandLayer(backward_layer, backward_nodes, forward_nodes, problem.getPredecessors)
+            if meeting is not None:
+                return _joinPaths(meeting[1], meeting[0])
+
+    # the two searches never met, there is no path
+    return None
+
+
+def _expandLayer(layer, nodes, other_nodes, expand):
+    """
+    Expands every node in 'layer', recording new states in 'nodes'.  Returns
+    the next layer and the cheapest (node, other node) pair that joins the two
+    searches, or None if this layer did not touch the other side.
+    """
+    next_layer = []
+    meeting = None
+    meeting_cost = None
+    for node in layer:
+        for neighbor in expand(node.state):
+            next_state = neighbor[0]
+            if next_state in nodes:
+                continue
+
+            # every action counts as a single step in breadth first search
+            next_node = node.child(next_state, neighbor[1], 1)
+            nodes[next_state] = next_node
+            next_layer.append(next_node)
+
+            # keep the whole layer going so the cheapest meeting point wins
+            if next_state in other_nodes:
+                cost = next_node.cost + other_nodes[next_state].cost
+                if meeting is None or cost < meeting_cost:
+                    meeting, meeting_cost = (next_node, other_nodes[next_state]), cost
+    return next_layer, meeting
+
+
+def _joinPaths(forward_node, backward_node):
+    """
+    Returns the actions from the start to the goal through the state shared by
+    a node of the forward search and a node of the backward search.
+    """
+    # backward nodes already store the forward action leading to their parent
+    path = forward_node.path()
+    node = backward_node
+    while node.parent is not None:
+        path.append(node.action)
+        node = node.parent
+    return path
 
-    # loop until the openSet is empty (failure) or we reach the goal state and return the path
-    while not (openSet.isEmpty()):
-        # get the node, path, and heuristic cost of the current highest priority element in the PQ and pop it off
-        node, path, cost = openSet.pop()
 
-        # if we find the goal state pop it off and return the path to the goal state
-        if (problem.isGoalState(node)):
-            return path
+def bidirectionalUniformCostSearch(problem, stats=None):
+    """
+    Run uniform cost search from the start and, over getPredecessors, from the
+    goal at the same time, returning a least cost path.  The problem has to
+    provide the same interface as for bidirectionalBreadthFirstSearch.
 
-        # if not node is not currently in our closedSet then add it to the closedSet, find the successors, and push the successor to the openSet
-        if node not in closedSet:
-            closedSet.add(node)
-            for next in problem.getSuccessors(node):
-                # same thing as node, path, and cost from above just for the successor state
-                state, direction, price = next
-                nextPath = path + [direction]  # get the next path which is the current path + the successor path
-                nextPrice = cost + price  # get the next cost which is the current cost + successor cost
-                openSet.push((state, nextPath, nextPrice),
-                             heuristic(state, problem) + nextPrice)  # push the successor into the openSet
-    # if we get here then the openSet is empty failure return 0
-    if openSet.isEmpty():
-        return 0
+    The side with the cheaper frontier is always expanded next, and the search
+    stops as soon as the two frontier minimums together cannot beat the best
+    path found through a shared state.
+    """
+    start_state = problem.getStartState()
+    goal_state = problem.getGoalState()
+    if problem.isGoalState(start_state):
+        return []
+
+    # each side has its own frontier, closed set and best node per state
+    sides = []
+    for state, expand in [(start_state, problem.getSuccessors), (goal_state, problem.getPredecessors)]:
+        frontier = searchStats.instrumentFrontier(util.IndexedPriorityQueue(key=lambda node: node.state), stats)
+        frontier.push(SearchNode(state), 0)
+        sides.append((frontier, set(), {state: SearchNode(state)}, expand))
+
+    best_meeting = None
+    best_cost = None
+    forward_frontier, backward_frontier = sides[0][0], sides[1][0]
+    while not forward_frontier.isEmpty() and not backward_frontier.isEmpty():
+        # no path through an unexpanded state can beat the best one found
+        if best_meeting is not None and \
+                forward_frontier.minPriority() + backward_frontier.minPriority() >= best_cost:
+            break
+
+        # expand from the side whose cheapest frontier node is cheaper
+        if forward_frontier.minPriority() <= backward_frontier.minPriority():
+            side, other = 0, 1
+        else:
+            side, other = 1, 0
+        frontier, closed, nodes, expand = sides[side]
+        other_nodes = sides[other][2]
+
+        node = frontier.pop()
+        if node.state in closed:
+            continue
+        closed.add(node.state)
+
+        for neighbor in expand(node.state):
+            next_state = neighbor[0]
+            next_cost = node.cost + neighbor[2]
+            if next_state in closed:
+                continue
+
+            # only keep the successor if it improves on the best known cost
+            if next_state not in nodes or next_cost < nodes[next_state].cost:
+                next_node = node.child(next_state, neighbor[1], neighbor[2])
+                nodes[next_state] = next_node
+                frontier.push(next_node, next_cost)
+
+                # remember the cheapest path through a state both sides have reached
+                if next_state in other_nodes:
+                    cost = next_cost + other_nodes[next_state].cost
+                    if best_meeting is None or cost < best_cost:
+                        best_meeting, best_cost = (next_node, other_nodes[next_state], side), cost
+
+    if best_meeting is None:
+        return None
+    node, other_node, side = best_meeting
+    if side == 0:
+        return _joinPaths(node, other_node)
+    return _joinPaths(other_node, node)
+
+
+def jumpPointSearch(problem, heuristic=nullHeuristic, stats=None):
+    """
+    A* over jump points, for problems on uniform cost grids such as
+    PositionSearchProblem.  Instead of getSuccessors, the problem provides
+    getJumpSuccessors(state, lastAction), which skips along straight runs of
+    the grid and returns only the cells where an optimal path may need to
+    turn, as (state, actions, cost) triples.  Paths are as cheap as those of
+    uniformCostSearch, while far fewer states are expanded in open areas.
+
+    That only holds with a single goal and unit step costs, so the problem's
+    checkJumpPointSearch() is called first and raises for anything else.
+    """
+    problem.checkJumpPointSearch()
+    def expand(node):
+        lastAction = node.action and node.action[-1]
+        return problem.getJumpSuccessors(node.state, lastAction)
+
+    openSet = util.IndexedPriorityQueue(key=lambda node: node.state)
+    path = graphSearch(problem, openSet, lambda state, cost: cost + heuristic(state, problem), expand, stats)
+    if path is None:
+        return None
+    # each node's action is the run of moves from its parent's jump point
+    return [action for actions in path for action in actions]
 
 
 # Abbreviations
@@ -262,3 +645,11 @@ bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+ids = iterativeDeepeningSearch
+idastar = idaStarSearch
+wastar = weightedAStarSearch
+beam = beamSearch
+arastar = anytimeRepairingAStarSearch
+bibfs = bidirectionalBreadthFirstSearch
+biucs = bidirectionalUniformCostSearch
+jps = jumpPointSearch
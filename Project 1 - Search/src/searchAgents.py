@@ -39,7 +39,15 @@ from game import Agent
 from game import Actions
 import util
 import time
+import collections
+import hashlib
+import shelve
+import multiprocessing
+import Queue
 import search
+import distanceCalculator
+import searchStats
+import sys
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -68,31 +76,74 @@ class SearchAgent(Agent):
     Options for fn include:
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
+      bidirectionalBreadthFirstSearch or bibfs
+      bidirectionalUniformCostSearch or biucs
+      jumpPointSearch or jps (PositionSearchProblem only)
+      iterativeDeepeningSearch or ids
+      idaStarSearch or idastar
+      weightedAStarSearch or wastar (weight=2)
+      beamSearch or beam (width=10)
+      anytimeRepairingAStarSearch or arastar (weight=3, weightStep=0.5, timeLimit=1.0)
+
+    Other arguments of the search function, like those in parentheses above,
+    can be given alongside fn, e.g. -a fn=wastar,heuristic=manhattanHeuristic,weight=3
+
+    With statsFile=<file>, statistics for every search (see searchStats.py)
+    are appended to that file as one JSON object per line.
+
+    With heuristicCacheSize=<n>, heuristic values are memoized for up to n
+    states (see MemoizedHeuristic) and the cache hit rate is printed.
+
+    Solutions are cached by layout, problem type, start state, search function,
+    heuristic and search arguments, so repeated games (-n) on one layout only
+    search once.  solutionCacheFile=<file> also stores them on disk for later
+    runs; cacheSolutions=False turns caching off.
+
+    With portfolio=<configurations>, several searches race on the problem in
+    separate processes (see PortfolioSearch) instead of fn.  Configurations
+    are separated by ';' and their fields by ':': the search function, then
+    its heuristic if it takes one, then name:value pairs of search arguments,
+    e.g. -a "prob=FoodSearchProblem,portfolio=ucs;astar:foodHeuristic;wastar:foodHeuristic:weight:3"
+    The first solution wins, or with portfolioDeadline=<seconds> the cheapest
+    one found by then.
 
 
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', statsFile=None, heuristicCacheSize=None,
+                 cacheSolutions=True, solutionCacheFile=None, portfolio=None, portfolioDeadline=None, **searchArgs):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
         if fn not in dir(search):
             raise AttributeError, fn + ' is not a search function in search.py.'
         func = getattr(search, fn)
+        self.searchName = fn
+
+        # Any other agent arguments (e.g. -a fn=wastar,weight=3) are passed on to the search function
+        for name in searchArgs:
+            if name not in func.func_code.co_varnames[:func.func_code.co_argcount]:
+                raise AttributeError, name + ' is not an argument of ' + fn + ' in search.py.'
+            searchArgs[name] = parseSearchArgument(searchArgs[name])
+        if searchArgs:
+            print('[SearchAgent] using search arguments %s' % searchArgs)
+
+        self.heuristic = None
         if 'heuristic' not in func.func_code.co_varnames:
             print('[SearchAgent] using function ' + fn)
-            self.searchFunction = func
-        else:
-            if heuristic in globals().keys():
-                heur = globals()[heuristic]
-            elif heuristic in dir(search):
-                heur = getattr(search, heuristic)
+            heur = None
+            if searchArgs:
+                self.searchFunction = lambda x: func(x, **searchArgs)
             else:
-                raise AttributeError, heuristic + ' is not a function in searchAgents.py or search.py.'
+                self.searchFunction = func
+        else:
+            heur = lookupHeuristic(heuristic)
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
+            if heuristicCacheSize is not None:
+                heur = self.heuristic = MemoizedHeuristic(heur, int(heuristicCacheSize))
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            self.searchFunction = lambda x: func(x, heuristic=heur, **searchArgs)
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
@@ -100,6 +151,29 @@ class SearchAgent(Agent):
         self.searchType = globals()[prob]
         print('[SearchAgent] using problem type ' + prob)
 
+        # Record statistics for every search as a line of JSON in statsFile
+        if statsFile is not None:
+            print('[SearchAgent] recording search statistics in ' + statsFile)
+            labels = {'fn': fn, 'prob': prob, 'heuristic': heur and heuristic}
+            self.searchFunction = searchStats.recordingSearch(func, heur, searchArgs, statsFile, labels)
+
+        # Race several search configurations instead
+        if portfolio is not None:
+            if portfolioDeadline is not None:
+                portfolioDeadline = float(portfolioDeadline)
+            self.searchFunction = PortfolioSearch(parsePortfolio(portfolio), portfolioDeadline)
+            self.searchName = 'the portfolio ' + portfolio
+            print('[SearchAgent] racing portfolio %s' % portfolio)
+
+        # Everything besides the layout and start state that determines the solution
+        self.solutionCache = None
+        if parseSearchArgument(cacheSolutions) or solutionCacheFile is not None:
+            self.solutionCache = SolutionCache(solutionCacheFile)
+            if portfolio is not None:
+                self.searchKey = (prob, 'portfolio', portfolio, portfolioDeadline)
+            else:
+                self.searchKey = (prob, fn, heur and heuristic, tuple(sorted(searchArgs.items())))
+
     def registerInitialState(self, state):
         """
         This is the first time that the agent sees the layout of the game
@@ -111,11 +185,25 @@ class SearchAgent(Agent):
         """
         if self.searchFunction == None: raise Exception, "No search function provided for SearchAgent"
         starttime = time.time()
+        self.actionIndex = 0 # Start from the beginning of the path in every game
         problem = self.searchType(state) # Makes a new search problem
+        cache = None
+        if 'solutionCache' in dir(self) and self.solutionCache is not None:
+            cache = self.solutionCache
+            key = cache.makeKey(state, problem, self.searchKey)
+            self.actions = cache.get(key)
+            if self.actions is not None:
+                print('Path found in the solution cache with total cost of %d' % problem.getCostOfActions(self.actions))
+                return
         self.actions  = self.searchFunction(problem) # Find a path
+        if type(self.actions) != type([]):
+            # incomplete searches such as beam search return None (astar returns 0) when they fail
+            raise Exception, 'No path found by %s' % getattr(self, 'searchName', 'the search function')
+        if cache is not None: cache.put(key, self.actions)
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if 'heuristic' in dir(self) and self.heuristic is not None: print('[SearchAgent] %s' % self.heuristic)
 
     def getAction(self, state):
         """
@@ -133,6 +221,198 @@ class SearchAgent(Agent):
         else:
             return Directions.STOP
 
+# Solutions found by SearchAgents in this process, see SolutionCache
+SOLUTION_CACHE = {}
+
+class SolutionCache:
+    """
+    Solutions (lists of actions) found by SearchAgents, keyed by a hash of the
+    layout text, the start state of the problem, the agent's search key
+    (problem type, search function, heuristic and search arguments) and a
+    hash of the source of the modules the solutions depend on (see
+    getSourceFingerprint), so that editing a search or a heuristic never
+    replays paths found by the old code.
+
+    Solutions are kept in SOLUTION_CACHE for the life of the process and, if
+    path is given, in a shelve database at path so later runs can reuse them.
+    """
+    def __init__(self, path=None):
+        self.path = path
+
+    def makeKey(self, gameState, problem, searchKey):
+        layoutHash = hashlib.sha1('\n'.join(gameState.data.layout.layoutText)).hexdigest()
+        return repr((layoutHash, problem.getStartState(), searchKey, getSourceFingerprint()))
+
+    def get(self, key):
+        "Returns the cached solution for key, or None"
+        if key in SOLUTION_CACHE:
+            return list(SOLUTION_CACHE[key])
+        if self.path is None:
+            return None
+        store = shelve.open(self.path)
+        try:
+            if key not in store:
+                return None
+            SOLUTION_CACHE[key] = store[key]
+        finally:
+            store.close()
+        return list(SOLUTION_CACHE[key])
+
+    def put(self, key, actions):
+        "Caches a solution; failed searches (which return None or 0) are not cached"
+        if type(actions) != type([]):
+            return
+        SOLUTION_CACHE[key] = list(actions)
+        if self.path is not None:
+            store = shelve.open(self.path)
+            try:
+                store[key] = list(actions)
+            finally:
+                store.close()
+
+# Modules whose code decides which path a search finds
+SOLUTION_SOURCE_MODULES = ['search', 'searchAgents', 'util', 'distanceCalculator']
+
+_SOURCE_FINGERPRINT = None
+
+def getSourceFingerprint():
+    "Returns a hash of the source of SOLUTION_SOURCE_MODULES, computed once per process"
+    global _SOURCE_FINGERPRINT
+    if _SOURCE_FINGERPRINT is None:
+        digest = hashlib.sha1()
+        for name in SOLUTION_SOURCE_MODULES:
+            path = sys.modules[name].__file__
+            if path.endswith('.pyc') or path.endswith('.pyo'):
+                path = path[:-1]
+            f = open(path, 'rb')
+            try:
+                digest.update(f.read())
+            finally:
+                f.close()
+        _SOURCE_FINGERPRINT = digest.hexdigest()
+    return _SOURCE_FINGERPRINT
+
+def lookupHeuristic(name):
+    "Returns the heuristic with the given name from searchAgents.py or search.py"
+    if name in globals().keys():
+        return globals()[name]
+    if name in dir(search):
+        return getattr(search, name)
+    raise AttributeError, name + ' is not a function in searchAgents.py or search.py.'
+
+def parsePortfolio(portfolio):
+    """
+    Turns a portfolio description (see SearchAgent) into a list of
+    (description, search function) pairs, where each search function takes
+    only the problem.
+    """
+    configurations = []
+    for description in portfolio.split(';'):
+        fields = description.split(':')
+        fn = fields.pop(0)
+        if fn not in dir(search):
+            raise AttributeError, fn + ' is not a search function in search.py.'
+        func = getattr(search, fn)
+        searchArgs = {}
+        if 'heuristic' in func.func_code.co_varnames:
+            if not fields:
+                raise AttributeError, 'no heuristic given for ' + fn + ' in portfolio ' + portfolio
+            searchArgs['heuristic'] = lookupHeuristic(fields.pop(0))
+        if len(fields) % 2 != 0:
+            raise AttributeError, 'search arguments must be name:value pairs in ' + description
+        for name, value in zip(fields[0::2], fields[1::2]):
+            if name not in func.func_code.co_varnames[:func.func_code.co_argcount]:
+                raise AttributeError, name + ' is not an argument of ' + fn + ' in search.py.'
+            searchArgs[name] = parseSearchArgument(value)
+        configurations.append((description, makePortfolioSearch(func, searchArgs)))
+    return configurations
+
+def makePortfolioSearch(func, searchArgs):
+    return lambda problem: func(problem, **searchArgs)
+
+class PortfolioSearch:
+    """
+    Runs several search configurations on the same problem at once, each in
+    its own process, and returns the first solution found.  With a deadline
+    (in seconds), it instead keeps collecting solutions until the deadline and
+    returns the cheapest, or the first one to arrive after it if none came in
+    time.  The searches still running are then terminated.
+
+    The processes are forked with the problem, so problems need not be
+    picklable; only the solutions are sent back.
+    """
+    def __init__(self, configurations, deadline=None):
+        self.configurations = configurations
+        self.deadline = deadline
+
+    def __call__(self, problem):
+        results = multiprocessing.Queue()
+        processes = []
+        for index, (description, searchFunction) in enumerate(self.configurations):
+            process = multiprocessing.Process(target=runPortfolioEntry,
+                                              args=(index, searchFunction, problem, results))
+            process.daemon = True
+            processes.append(process)
+
+        start = time.time()
+        best = None
+        finished = 0
+        try:
+            for process in processes:
+                process.start()
+            while finished < len(processes):
+                if best is not None and (self.deadline is None or time.time() - start >= self.deadline):
+                    break
+                try:
+                    result = results.get(True, 0.05)
+                except Queue.Empty:
+                    # a search that died without reporting back counts as finished
+                    if not any(process.is_alive() for process in processes) and results.empty():
+                        break
+                    continue
+                finished += 1
+                index, actions, cost, expanded = result
+                if actions is not None and (best is None or cost < best[2]):
+                    best = result
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+        if best is None:
+            print('[SearchAgent] no search in the portfolio found a solution')
+            return None
+        index, actions, cost, expanded = best
+        print('[SearchAgent] portfolio winner: %s (cost %d, %d nodes expanded)' %
+              (self.configurations[index][0], cost, expanded))
+        if '_expanded' in dir(problem): problem._expanded = expanded
+        return actions
+
+def runPortfolioEntry(index, searchFunction, problem, results):
+    "Runs one portfolio search in a child process and reports its result"
+    if 'visualize' in dir(problem): problem.visualize = False
+    try:
+        actions = searchFunction(problem)
+    except (Exception, SystemExit):
+        actions = None
+    if type(actions) != type([]):
+        # failed searches return None or 0
+        results.put((index, None, None, 0))
+    else:
+        results.put((index, actions, problem.getCostOfActions(actions), getattr(problem, '_expanded', 0)))
+
+def parseSearchArgument(value):
+    "Converts an agent argument given on the command line to a bool, int or float where possible"
+    if value in ['True', 'False']:
+        return value == 'True'
+    for convert in [int, float]:
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
 class PositionSearchProblem(search.SearchProblem):
     """
     A search problem defines the state space, start state, goal test, successor
@@ -153,6 +433,7 @@ class PositionSearchProblem(search.SearchProblem):
         goal: A position in the gameState
         """
         self.walls = gameState.getWalls()
+        self.adjacency = distanceCalculator.getAdjacency(gameState.data.layout)
         self.startState = gameState.getPacmanPosition()
         if start != None: self.startState = start
         self.goal = goal
@@ -192,15 +473,87 @@ class PositionSearchProblem(search.SearchProblem):
          cost of expanding to that successor
         """
 
+        costFn = self.costFn
+        successors = [(nextState, action, costFn(nextState))
+                      for nextState, action in self.adjacency.successors[state]]
+
+        # Bookkeeping for display purposes
+        self._expanded += 1 # DO NOT CHANGE
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return successors
+
+    def getGoalState(self):
+        return self.goal
+
+    def getPredecessors(self, state):
+        """
+        Returns predecessor states, the actions that lead from them to state,
+        and the cost of taking that action.  This is the reverse of
+        getSuccessors and lets bidirectional searches work back from the goal.
+        """
+
+        cost = self.costFn(state)
+        predecessors = [(prevState, action, cost)
+                        for prevState, action in self.adjacency.predecessors[state]]
+
+        # Bookkeeping for display purposes
+        self._expanded += 1 # DO NOT CHANGE
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
+    def checkJumpPointSearch(self):
+        """
+        Raises an exception unless jump point search finds optimal paths for
+        this problem: it needs a single goal cell and a cost of 1 for every
+        open cell.
+        """
+        if 'goal' not in dir(self):
+            raise Exception, 'jump point search needs a single goal, which %s does not have' % \
+                self.__class__.__name__
+        for pos in self.walls.asList(False):
+            cost = self.costFn(pos)
+            if cost != 1:
+                raise Exception, 'jump point search needs unit step costs, but costFn%s is %s' % \
+                    (str(pos), cost)
+
+    def getJumpSuccessors(self, state, lastAction=None):
+        """
+        Returns the successors of state for jump point search, as triples
+        (jumpPoint, actions, cost) where actions is the straight run of moves
+        from state to jumpPoint.  lastAction is the move that reached state
+        (None at the start); it decides which directions are worth scanning.
+
+        Optimal paths are only searched in a canonical form: vertical runs,
+        which may turn east or west at any cell, and horizontal runs, which
+        only turn north or south just past the corner of a wall.  Every step
+        is assumed to cost 1, so costFn is not consulted; jumpPointSearch
+        calls checkJumpPointSearch first to make sure that holds.
+        """
+        if lastAction is None:
+            directions = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
+        elif lastAction in (Directions.NORTH, Directions.SOUTH):
+            directions = [lastAction, Directions.EAST, Directions.WEST]
+        else:
+            x, y = state
+            dx = int(Actions.directionToVector(lastAction)[0])
+            directions = [lastAction]
+            for turn in [Directions.NORTH, Directions.SOUTH]:
+                dy = int(Actions.directionToVector(turn)[1])
+                if not self.walls[x][y + dy] and self.walls[x - dx][y + dy]:
+                    directions.append(turn)
+
         successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-                successors.append( ( nextState, action, cost) )
+        for direction in directions:
+            jumpPoint = self._jump(state, direction)
+            if jumpPoint is not None:
+                steps = abs(jumpPoint[0] - state[0]) + abs(jumpPoint[1] - state[1])
+                successors.append((jumpPoint, [direction] * steps, steps))
 
         # Bookkeeping for display purposes
         self._expanded += 1 # DO NOT CHANGE
@@ -210,6 +563,31 @@ class PositionSearchProblem(search.SearchProblem):
 
         return successors
 
+    def _jump(self, state, direction):
+        """
+        Moves from state in direction until reaching the goal or a jump point,
+        and returns it, or None if a wall comes first.
+        """
+        x, y = state
+        dx, dy = Actions.directionToVector(direction)
+        dx, dy = int(dx), int(dy)
+        walls = self.walls
+        while True:
+            x, y = x + dx, y + dy
+            if walls[x][y]:
+                return None
+            if (x, y) == self.goal:
+                return (x, y)
+            if dx != 0:
+                # a horizontal run stops where a wall beside it ends
+                if (not walls[x][y + 1] and walls[x - dx][y + 1]) or \
+                   (not walls[x][y - 1] and walls[x - dx][y - 1]):
+                    return (x, y)
+            elif self._jump((x, y), Directions.EAST) is not None or \
+                 self._jump((x, y), Directions.WEST) is not None:
+                # a vertical run stops wherever a horizontal run finds something
+                return (x, y)
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -262,6 +640,57 @@ def euclideanHeuristic(position, problem, info={}):
     xy2 = problem.goal
     return ( (xy1[0] - xy2[0]) ** 2 + (xy1[1] - xy2[1]) ** 2 ) ** 0.5
 
+class MemoizedHeuristic:
+    """
+    Wraps a heuristic so that its value for each state is computed once and
+    then looked up.  At most maxSize values are kept; when the cache is full
+    the least recently used one is evicted.  hits and misses count lookups.
+
+    Values are only valid for one problem, so the cache is cleared whenever
+    the heuristic is called with a different problem object.
+
+    > heuristic = MemoizedHeuristic(foodHeuristic, maxSize=50000)
+    > search.astar(problem, heuristic)
+    > print heuristic.hits, heuristic.misses
+
+    SearchAgent wraps its heuristic this way when given heuristicCacheSize.
+    """
+    def __init__(self, heuristic, maxSize=100000):
+        self.heuristic = heuristic
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self.problem = None
+        self.cache = collections.OrderedDict()
+
+    def __call__(self, state, problem=None):
+        if problem is not self.problem:
+            self.problem = problem
+            self.cache.clear()
+        if state in self.cache:
+            self.hits += 1
+            value = self.cache.pop(state)
+        else:
+            self.misses += 1
+            value = self.heuristic(state, problem)
+            if len(self.cache) >= self.maxSize:
+                self.cache.popitem(last=False)
+        self.cache[state] = value
+        return value
+
+    def __str__(self):
+        return 'heuristic cache: %d hits, %d misses' % (self.hits, self.misses)
+
+def memoized(maxSize=100000):
+    """
+    Decorator form of MemoizedHeuristic, for heuristics that should always be
+    memoized:
+
+    > @memoized(maxSize=10000)
+    > def myHeuristic(state, problem): ...
+    """
+    return lambda heuristic: MemoizedHeuristic(heuristic, maxSize)
+
 #####################################################
 # This portion is incomplete.  Time to write code!  #
 #####################################################
@@ -270,7 +699,9 @@ class CornersProblem(search.SearchProblem):
     """
     This search problem finds paths through all four corners of a layout.
 
-    You must select a suitable state space and successor function
+    A search state is a single int, (cell << 4) | visitedCorners, where cell
+    indexes the open squares of the layout (see getPosition) and bit i of
+    visitedCorners is set once corners[i] has been visited.
     """
 
     def __init__(self, startingGameState):
@@ -285,24 +716,40 @@ class CornersProblem(search.SearchProblem):
             if not startingGameState.hasFood(*corner):
                 print 'Warning: no food in corner ' + str(corner)
         self._expanded = 0 # DO NOT CHANGE; Number of search nodes expanded
-        # Please add any code here which you would like to use
-        # in initializing the problem
-        "*** YOUR CODE HERE ***"
+
+        # Number the open squares and record, for each one, the legal moves
+        # out of it as (action, encoded destination) pairs.  The destination
+        # already carries the bit of the corner it lands on, if any.
+        self.cellPositions = self.walls.asList(False)
+        cellIds = dict((pos, i) for i, pos in enumerate(self.cellPositions))
+        self.cornerBits = dict((corner, 1 << i) for i, corner in enumerate(self.corners))
+        # On one-row or one-column layouts corners coincide and share one bit
+        self.goalMask = 0
+        for bit in self.cornerBits.values():
+            self.goalMask |= bit
+        self.neighbors = []
+        for x, y in self.cellPositions:
+            moves = []
+            for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(action)
+                nextPos = (int(x + dx), int(y + dy))
+                if nextPos in cellIds:
+                    moves.append((action, cellIds[nextPos] << 4 | self.cornerBits.get(nextPos, 0)))
+            self.neighbors.append(moves)
+        self.start = cellIds[self.startingPosition] << 4 | self.cornerBits.get(self.startingPosition, 0)
 
     def getStartState(self):
         """
         Returns the start state (in your state space, not the full Pacman state
         space)
         """
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        return self.start
 
     def isGoalState(self, state):
         """
         Returns whether this search state is a goal state of the problem.
         """
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        return state & self.goalMask == self.goalMask
 
     def getSuccessors(self, state):
         """
@@ -314,21 +761,19 @@ class CornersProblem(search.SearchProblem):
             state, 'action' is the action required to get there, and 'stepCost'
             is the incremental cost of expanding to that successor
         """
-
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            # Add a successor state to the successor list if the action is legal
-            # Here's a code snippet for figuring out whether a new position hits a wall:
-            #   x,y = currentPosition
-            #   dx, dy = Actions.directionToVector(action)
-            #   nextx, nexty = int(x + dx), int(y + dy)
-            #   hitsWall = self.walls[nextx][nexty]
-
-            "*** YOUR CODE HERE ***"
-
+        visited = state & 15
+        successors = [(nextState | visited, action, 1) for action, nextState in self.neighbors[state >> 4]]
         self._expanded += 1 # DO NOT CHANGE
         return successors
 
+    def getPosition(self, state):
+        "Returns pacman's (x,y) position in state"
+        return self.cellPositions[state >> 4]
+
+    def getUnvisitedCorners(self, state):
+        "Returns the corners not yet visited in state"
+        return [corner for corner in self.corners if not state & self.cornerBits[corner]]
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions.  If those actions
@@ -347,8 +792,9 @@ def cornersHeuristic(state, problem):
     """
     A heuristic for the CornersProblem that you defined.
 
-      state:   The current search state
-               (a data structure you chose in your search problem)
+      state:   The current search state, an int encoding pacman's position
+               and the visited corners (see problem.getPosition and
+               problem.getUnvisitedCorners)
 
       problem: The CornersProblem instance for this layout.
 
@@ -373,12 +819,16 @@ class FoodSearchProblem:
     A search problem associated with finding the a path that collects all of the
     food (dots) in a Pacman game.
 
-    A search state in this problem is a tuple ( pacmanPosition, foodGrid ) where
+    A search state in this problem is a tuple ( pacmanPosition, foodMask ) where
       pacmanPosition: a tuple (x,y) of integers specifying Pacman's position
-      foodGrid:       a Grid (see game.py) of either True or False, specifying remaining food
+      foodMask:       an integer with bit i set if the food at foodPositions[i]
+                      remains; use getFoodPositions to get a list of coordinates
     """
     def __init__(self, startingGameState):
-        self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
+        food = startingGameState.getFood()
+        self.foodPositions = food.asList()
+        self.foodIndex = dict((pos, i) for i, pos in enumerate(self.foodPositions))
+        self.start = (startingGameState.getPacmanPosition(), (1 << len(self.foodPositions)) - 1)
         self.walls = startingGameState.getWalls()
         self.startingGameState = startingGameState
         self._expanded = 0 # DO NOT CHANGE
@@ -388,7 +838,7 @@ class FoodSearchProblem:
         return self.start
 
     def isGoalState(self, state):
-        return state[1].count() == 0
+        return state[1] == 0
 
     def getSuccessors(self, state):
         "Returns successor states, the actions they require, and a cost of 1."
@@ -399,14 +849,25 @@ class FoodSearchProblem:
             dx, dy = Actions.directionToVector(direction)
             nextx, nexty = int(x + dx), int(y + dy)
             if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
+                nextFood = state[1]
+                if (nextx, nexty) in self.foodIndex:
+                    nextFood &= ~(1 << self.foodIndex[(nextx, nexty)])
                 successors.append( ( ((nextx, nexty), nextFood), direction, 1) )
         return successors
 
+    def getFoodPositions(self, foodMask):
+        "Returns the coordinates of the food remaining in foodMask"
+        positions = []
+        while foodMask:
+            lowest = foodMask & -foodMask
+            positions.append(self.foodPositions[lowest.bit_length() - 1])
+            foodMask ^= lowest
+        return positions
+
     def getCostOfActions(self, actions):
         """Returns the cost of a particular sequence of actions.  If those actions
         include an illegal move, return 999999"""
+        if actions == None: return 999999
         x,y= self.getStartState()[0]
         cost = 0
         for action in actions:
@@ -438,9 +899,9 @@ def foodHeuristic(state, problem):
     other hand, inadmissible or inconsistent heuristics may find optimal
     solutions, so be careful.
 
-    The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a Grid
-    (see game.py) of either True or False. You can call foodGrid.asList() to get
-    a list of food coordinates instead.
+    The state is a tuple ( pacmanPosition, foodMask ) where foodMask is an
+    integer bitmask over problem.foodPositions (see FoodSearchProblem). You can
+    call problem.getFoodPositions(foodMask) to get a list of food coordinates.
 
     If you want access to info like walls, capsules, etc., you can query the
     problem.  For example, problem.walls gives you a Grid of where the walls
@@ -453,22 +914,24 @@ def foodHeuristic(state, problem):
     Subsequent calls to this heuristic can access
     problem.heuristicInfo['wallCount']
     """
-    position, foodGrid = state
+    position, foodMask = state
 
     # if is goal state return 0
     if problem.isGoalState(state):
         return 0
 
-    # Get the game state of problem
-    gameState = problem.startingGameState
+    # Get the layout's distance table once per problem rather than once per food
+    if 'distanceTable' not in problem.heuristicInfo:
+        problem.heuristicInfo['distanceTable'] = distanceCalculator.getDistancer(problem.startingGameState.data.layout)
+    distancer = problem.heuristicInfo['distanceTable']
 
     # maxDistance variable to get the max distance of food in the maze initally set to 0
     maxDistance = 0
 
     # for food in the food grid as a list
-    for food in foodGrid.asList():
-        # returns maze distance between our position and food in the grid using A* of the game state of problem
-        distanceOfFoodInMaze = mazeDistance(position, food, gameState)
+    for food in problem.getFoodPositions(foodMask):
+        # returns maze distance between our position and food in the grid from the distance table
+        distanceOfFoodInMaze = distancer.getDistance(position, food)
 
         # get the max distance of the distanceOfFoodIn the maze
         maxDistance = max(maxDistance, distanceOfFoodInMaze)
@@ -476,20 +939,66 @@ def foodHeuristic(state, problem):
     # and return the max distance
     return maxDistance
 
+def mstFoodHeuristic(state, problem):
+    """
+    A tighter consistent heuristic for the FoodSearchProblem: the maze
+    distance to the nearest food plus the weight of a minimum spanning tree,
+    under maze distances, over all of the remaining food.
+
+    Eating the remaining food means reaching some food and then connecting all
+    of it, which costs at least the spanning tree.  Spanning tree weights
+    depend only on the food left, so they are memoized by food bitmask in
+    problem.heuristicInfo and shared by every state with the same food.  All
+    distances are to food, so one distance field per food is enough (see
+    distanceCalculator.TargetDistancer).
+
+    > python pacman.py -l trickySearch -p SearchAgent -a fn=astar,prob=FoodSearchProblem,heuristic=mstFoodHeuristic
+    """
+    position, foodMask = state
+    if foodMask == 0:
+        return 0
+    info = problem.heuristicInfo
+    if 'distancer' not in info:
+        info['distancer'] = distanceCalculator.TargetDistancer(problem.walls, problem.foodPositions)
+        info['mstWeights'] = {}
+    distancer, mstWeights = info['distancer'], info['mstWeights']
+
+    food = problem.getFoodPositions(foodMask)
+    if foodMask not in mstWeights:
+        mstWeights[foodMask] = spanningTreeWeight(food, distancer)
+    nearest = min(distancer.getDistance(position, dot) for dot in food)
+    return nearest + mstWeights[foodMask]
+
+def spanningTreeWeight(points, distancer):
+    "Returns the weight of a minimum spanning tree over points (Prim's algorithm)"
+    # cheapest known edge from the tree to each point not yet in it
+    bestEdge = dict((point, distancer.getDistance(points[0], point)) for point in points[1:])
+    weight = 0
+    while bestEdge:
+        point = min(bestEdge, key=bestEdge.get)
+        weight += bestEdge.pop(point)
+        for other in bestEdge:
+            bestEdge[other] = min(bestEdge[other], distancer.getDistance(point, other))
+    return weight
+
 class ClosestDotSearchAgent(SearchAgent):
-    "Search for all food using a sequence of searches"
+    """
+    Search for all food by repeatedly going to the closest dot.
+
+    The tour is planned on a NearestGoalField (distanceCalculator.py) over the
+    food, which keeps the distance to the closest dot for every square and
+    only repairs the part of it that changes when a dot is eaten, rather than
+    running a fresh search and replaying it through the game for every dot.
+    """
     def registerInitialState(self, state):
         self.actions = []
-        currentState = state
-        while(currentState.getFood().count() > 0):
-            nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
+        adjacency = distanceCalculator.getAdjacency(state.data.layout)
+        field = distanceCalculator.NearestGoalField(adjacency, state.getFood().asList())
+        position = state.getPacmanPosition()
+        while field.hasGoals():
+            nextPathSegment, position = field.pathToNearestGoal(position)
             self.actions += nextPathSegment
-            for action in nextPathSegment:
-                legal = currentState.getLegalActions()
-                if action not in legal:
-                    t = (str(action), str(currentState))
-                    raise Exception, 'findPathToClosestDot returned an illegal move: %s!\n%s' % t
-                currentState = currentState.generateSuccessor(0, action)
+            field.removeGoal(position)
         self.actionIndex = 0
         print 'Path found with cost %d.' % len(self.actions)
 
@@ -531,6 +1040,7 @@ class AnyFoodSearchProblem(PositionSearchProblem):
 
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
+        self.adjacency = distanceCalculator.getAdjacency(gameState.data.layout)
         self.startState = gameState.getPacmanPosition()
         self.costFn = lambda x: 1
         self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
@@ -548,9 +1058,11 @@ class AnyFoodSearchProblem(PositionSearchProblem):
 
 def mazeDistance(point1, point2, gameState):
     """
-    Returns the maze distance between any two points, using the search functions
-    you have already built. The gameState can be any game state -- Pacman's
-    position in that state is ignored.
+    Returns the maze distance between any two points.  The gameState can be
+    any game state -- Pacman's position in that state is ignored.
+
+    Distances come from a table computed once per layout (distanceCalculator.py)
+    whose Distancer is kept on the layout, so each later lookup is O(1).
 
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
@@ -561,5 +1073,4 @@ def mazeDistance(point1, point2, gameState):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.astar(prob))
+    return distanceCalculator.getDistancer(gameState.data.layout).getDistance(point1, point2)
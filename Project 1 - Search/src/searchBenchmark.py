@@ -0,0 +1,271 @@
+# searchBenchmark.py
+# ------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Benchmarks the search functions in search.py on every layout in layouts/ and
+on the eight puzzles in eightpuzzle.py, and compares the results against a
+stored baseline.
+
+Every layout gets a PositionSearchProblem (to its only food, or to (1,1)),
+layouts with little food also get a FoodSearchProblem, and the corners
+layouts get a CornersProblem.  Each is solved with dfs, bfs, ucs and astar
+with each heuristic that applies.  Every case runs in its own process so its
+peak memory can be measured.
+
+> python searchBenchmark.py --save-baseline    # record the current numbers
+> python searchBenchmark.py                    # compare against them
+
+The run fails (exit status 1) if any case got slower, expanded more nodes,
+used more memory or found a more expensive path than the baseline allows,
+or if there is no baseline to compare against.  The committed baseline,
+searchBenchmarkBaseline.json, was saved with --counts-only: it holds only
+expansions and path costs, which do not depend on the machine.
+
+A case that runs out of time (--timeout) is only a regression if the
+baseline recorded a time that would have fit; otherwise it is reported but
+does not fail the run, since a slow or busy machine can cause it.
+"""
+
+import eightpuzzle
+import layout
+import pacman
+import search
+import searchAgents
+import searchStats
+import json
+import multiprocessing
+import optparse
+import os
+import sys
+
+# (search function, heuristic) pairs to run for each kind of problem
+POSITION_SEARCHES = [('dfs', None), ('bfs', None), ('ucs', None),
+                     ('astar', 'manhattanHeuristic'), ('astar', 'euclideanHeuristic')]
+FOOD_SEARCHES = [('dfs', None), ('bfs', None), ('ucs', None), ('astar', 'foodHeuristic'),
+                 ('astar', 'mstFoodHeuristic')]
+CORNERS_SEARCHES = [('dfs', None), ('bfs', None), ('ucs', None), ('astar', 'cornersHeuristic')]
+EIGHT_PUZZLE_SEARCHES = [('dfs', None), ('bfs', None), ('ucs', None), ('astar', 'nullHeuristic'),
+                         ('astar', 'patternDatabaseHeuristic')]
+
+# Metrics compared against the baseline
+METRICS = ['time', 'expanded', 'memoryKB']
+
+# The metrics that are the same on every machine, which is all that
+# --counts-only saves (the path cost is always saved and compared)
+COUNT_METRICS = ['expanded']
+
+def getCases(layoutNames, maxFood, algorithms):
+    """
+    Returns the benchmark cases as (instance, problem type, search function,
+    heuristic) tuples.  The instance is a layout name, or 'eightpuzzle<n>'.
+    """
+    cases = []
+    for name in layoutNames:
+        lay = layout.getLayout(name)
+        searches = []
+        if getPositionGoal(lay) is not None:
+            searches += [('PositionSearchProblem', s) for s in POSITION_SEARCHES]
+        if 0 < lay.totalFood <= maxFood:
+            searches += [('FoodSearchProblem', s) for s in FOOD_SEARCHES]
+        if 'Corners' in name:
+            searches += [('CornersProblem', s) for s in CORNERS_SEARCHES]
+        for problemType, (fn, heuristic) in searches:
+            cases.append((name, problemType, fn, heuristic))
+    for i in range(len(eightpuzzle.EIGHT_PUZZLE_DATA)):
+        for fn, heuristic in EIGHT_PUZZLE_SEARCHES:
+            cases.append(('eightpuzzle%d' % i, 'EightPuzzleSearchProblem', fn, heuristic))
+    return [case for case in cases if algorithms is None or case[2] in algorithms]
+
+def caseName(case):
+    instance, problemType, fn, heuristic = case
+    return '%s:%s:%s:%s' % (instance, problemType, fn, heuristic or '-')
+
+def getPositionGoal(lay):
+    "The goal of a layout's position problem: its only food if it has one, else (1,1) if open"
+    if lay.totalFood == 1:
+        return lay.food.asList()[0]
+    if not lay.walls[1][1]:
+        return (1, 1)
+    return None
+
+def makeProblem(instance, problemType):
+    if problemType == 'EightPuzzleSearchProblem':
+        puzzle = eightpuzzle.loadEightPuzzle(int(instance[len('eightpuzzle'):]))
+        return eightpuzzle.EightPuzzleSearchProblem(puzzle)
+    lay = layout.getLayout(instance)
+    gameState = pacman.GameState()
+    gameState.initialize(lay, 0)
+    if problemType == 'PositionSearchProblem':
+        return searchAgents.PositionSearchProblem(gameState, goal=getPositionGoal(lay),
+                                                  warn=False, visualize=False)
+    return getattr(searchAgents, problemType)(gameState)
+
+def runCase(case, results):
+    "Solves one case and puts its measurements on the results queue"
+    instance, problemType, fn, heuristicName = case
+    problem = makeProblem(instance, problemType)
+    heuristic = None
+    if heuristicName is not None:
+        heuristic = getattr(searchAgents, heuristicName, None) or \
+                    getattr(eightpuzzle, heuristicName, None) or getattr(search, heuristicName)
+    path, stats = searchStats.searchWithStats(getattr(search, fn), problem, heuristic)
+    results.put({'status': 'ok', 'time': stats.totalTime, 'expanded': stats.expanded,
+                 'memoryKB': stats.peakMemoryKB, 'pathCost': stats.pathCost})
+
+def runCaseInProcess(case, timeout):
+    """
+    Runs a case in a fresh process, so that its peak memory is its own, and
+    returns its measurements.  Cases that crash or run out of time get a
+    status of 'error' or 'timeout' instead of measurements.
+    """
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=runCase, args=(case, results))
+    process.start()
+    process.join(timeout)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+        return {'status': 'timeout'}
+    if results.empty():
+        return {'status': 'error'}
+    return results.get()
+
+def findRegressions(results, baseline, threshold, minTime, timeout):
+    """
+    Returns (regressions, warnings), describing every case that is worse
+    than its baseline: a metric more than threshold (a fraction) above it, a
+    more expensive path, or a case that no longer finishes.  Time differences
+    under minTime seconds are treated as noise, and metrics the baseline does
+    not have (see --counts-only) are not compared.
+
+    A case that ran out of time is only a regression if the baseline says
+    it used to finish well within timeout seconds.  Without a recorded time
+    it may just have met a slower or busier machine, so it is a warning.
+    """
+    regressions, warnings = [], []
+    for name in sorted(results):
+        if name not in baseline or baseline[name]['status'] != 'ok':
+            continue
+        result, base = results[name], baseline[name]
+        if result['status'] == 'timeout' and \
+           ('time' not in base or base['time'] * (1 + threshold) >= timeout):
+            warnings.append('%s: timeout after %ss' % (name, formatValue(timeout)))
+            continue
+        if result['status'] != 'ok':
+            regressions.append('%s: %s' % (name, result['status']))
+            continue
+        for metric in METRICS:
+            if metric not in base:
+                continue
+            if result[metric] > base[metric] * (1 + threshold):
+                if metric == 'time' and result[metric] - base[metric] < minTime:
+                    continue
+                regressions.append('%s: %s %s -> %s' % (name, metric, formatValue(base[metric]),
+                                                        formatValue(result[metric])))
+        if result['pathCost'] > base['pathCost'] + 1e-6:
+            regressions.append('%s: path cost %s -> %s' % (name, base['pathCost'], result['pathCost']))
+    return regressions, warnings
+
+def formatValue(value):
+    if isinstance(value, float):
+        return '%.3f' % value
+    return str(value)
+
+def readCommand(argv):
+    parser = optparse.OptionParser(description='Benchmark the search functions in search.py')
+    parser.add_option('--baseline', dest='baseline', default='searchBenchmarkBaseline.json',
+                      help='JSON file holding the baseline results [Default: %default]')
+    parser.add_option('--save-baseline', dest='saveBaseline', action='store_true', default=False,
+                      help='Write this run\'s results to the baseline file instead of comparing')
+    parser.add_option('--counts-only', dest='countsOnly', action='store_true', default=False,
+                      help='With --save-baseline, leave out time and memory, which vary between machines')
+    parser.add_option('--threshold', dest='threshold', type='float', default=0.25,
+                      help='Allowed increase over the baseline, as a fraction [Default: %default]')
+    parser.add_option('--min-time', dest='minTime', type='float', default=0.05,
+                      help='Time increases below this many seconds are ignored [Default: %default]')
+    parser.add_option('--timeout', dest='timeout', type='float', default=180,
+                      help='Seconds allowed for each case [Default: %default]')
+    parser.add_option('--layouts', dest='layouts', default=None,
+                      help='Comma separated layouts to run [Default: all of layouts/]')
+    parser.add_option('--algorithms', dest='algorithms', default=None,
+                      help='Comma separated search functions to run, e.g. bfs,astar [Default: all]')
+    parser.add_option('--max-food', dest='maxFood', type='int', default=10,
+                      help='Only run FoodSearchProblems on layouts with at most this much food [Default: %default]')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+def main(argv):
+    options = readCommand(argv)
+    if options.layouts is not None:
+        layoutNames = options.layouts.split(',')
+    else:
+        layoutNames = sorted(f[:-len('.lay')] for f in os.listdir('layouts') if f.endswith('.lay'))
+    algorithms = None
+    if options.algorithms is not None:
+        algorithms = options.algorithms.split(',')
+
+    results = {}
+    print '%-62s %8s %9s %10s %8s' % ('case', 'time', 'expanded', 'memoryKB', 'cost')
+    for case in getCases(layoutNames, options.maxFood, algorithms):
+        name = caseName(case)
+        results[name] = runCaseInProcess(case, options.timeout)
+        result = results[name]
+        if result['status'] == 'ok':
+            print '%-62s %8.3f %9d %10d %8s' % (name, result['time'], result['expanded'],
+                                                result['memoryKB'], formatValue(result['pathCost']))
+        else:
+            print '%-62s %8s' % (name, result['status'])
+        sys.stdout.flush()
+
+    if options.saveBaseline:
+        if options.countsOnly:
+            for result in results.values():
+                for metric in METRICS:
+                    if metric not in COUNT_METRICS:
+                        result.pop(metric, None)
+        f = open(options.baseline, 'w')
+        try:
+            json.dump(results, f, indent=2, sort_keys=True)
+        finally:
+            f.close()
+        print 'Saved %d results to %s' % (len(results), options.baseline)
+        return 0
+
+    if not os.path.exists(options.baseline):
+        print 'No baseline at %s; run with --save-baseline to record one' % options.baseline
+        return 1
+    f = open(options.baseline)
+    try:
+        baseline = json.load(f)
+    finally:
+        f.close()
+    regressions, warnings = findRegressions(results, baseline, options.threshold,
+                                            options.minTime, options.timeout)
+    if warnings:
+        print '%d cases ran out of time and were not compared (raise --timeout to compare them):' % \
+            len(warnings)
+        for warning in warnings:
+            print '  ' + warning
+    if regressions:
+        print '%d regressions against %s:' % (len(regressions), options.baseline)
+        for regression in regressions:
+            print '  ' + regression
+        return 1
+    print 'No regressions against %s' % options.baseline
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,231 @@
+# searchStats.py
+# --------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Instrumentation for the search functions in search.py.
+
+searchWithStats runs any search function and returns its path together with
+a SearchStats object:
+
+> path, stats = searchWithStats(search.astar, problem, manhattanHeuristic)
+> print stats.toJSON()
+
+Expansions, generated nodes and the time spent in getSuccessors and in the
+heuristic are measured for every search, by wrapping the problem and the
+heuristic.  Frontier measurements (pushes, duplicate pushes, peak size and
+time spent in queue operations) need the search's cooperation: search
+functions that accept a 'stats' argument wrap their frontier with
+instrumentFrontier.
+"""
+
+import json
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+class SearchStats:
+    """
+    Counters and timers collected while running one search.  Times are in
+    seconds, peakMemoryKB is the peak resident size of the whole process.
+    """
+    FIELDS = ['expanded', 'generated', 'pushes', 'duplicatePushes', 'pops', 'peakFrontier',
+              'heuristicCalls', 'successorTime', 'heuristicTime', 'queueTime', 'totalTime',
+              'peakMemoryKB', 'pathLength', 'pathCost']
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+        self.frontierSize = 0
+
+    def asDict(self):
+        return dict((field, getattr(self, field)) for field in self.FIELDS)
+
+    def toJSON(self, **extra):
+        "Returns the statistics, plus any extra labels given, as a JSON object"
+        values = self.asDict()
+        values.update(extra)
+        return json.dumps(values, sort_keys=True)
+
+    def __str__(self):
+        return ('expanded %d, generated %d, peak frontier %d, duplicate pushes %d, '
+                'successors %.3fs, heuristic %.3fs, queue %.3fs, total %.3fs') % \
+               (self.expanded, self.generated, self.peakFrontier, self.duplicatePushes,
+                self.successorTime, self.heuristicTime, self.queueTime, self.totalTime)
+
+class InstrumentedProblem:
+    """
+    Wraps a search problem, counting and timing calls to getSuccessors (and
+    getPredecessors or getJumpSuccessors, for the searches that use them).  Every other attribute is
+    looked up on the wrapped problem, so heuristics can still use problem.goal,
+    problem.walls and so on.
+    """
+    def __init__(self, problem, stats):
+        self.problem = problem
+        self.stats = stats
+
+    def getStartState(self):
+        return self.problem.getStartState()
+
+    def isGoalState(self, state):
+        return self.problem.isGoalState(state)
+
+    def getSuccessors(self, state):
+        return self._expand(self.problem.getSuccessors, state)
+
+    def getPredecessors(self, state):
+        return self._expand(self.problem.getPredecessors, state)
+
+    def getJumpSuccessors(self, state, lastAction):
+        return self._expand(lambda state: self.problem.getJumpSuccessors(state, lastAction), state)
+
+    def getCostOfActions(self, actions):
+        return self.problem.getCostOfActions(actions)
+
+    def _expand(self, expand, state):
+        start = time.time()
+        successors = expand(state)
+        self.stats.successorTime += time.time() - start
+        self.stats.expanded += 1
+        self.stats.generated += len(successors)
+        return successors
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+def instrumentHeuristic(heuristic, stats):
+    "Returns a heuristic that behaves like 'heuristic' but counts and times its calls"
+    def instrumented(state, problem=None):
+        start = time.time()
+        value = heuristic(state, problem)
+        stats.heuristicTime += time.time() - start
+        stats.heuristicCalls += 1
+        return value
+    return instrumented
+
+class InstrumentedFrontier:
+    """
+    Wraps a Stack, Queue, PriorityQueue or IndexedPriorityQueue, timing its
+    operations and tracking its size.  A push is counted as a duplicate when
+    the state it carries has been pushed onto this frontier before.
+    """
+    def __init__(self, frontier, stats):
+        self.frontier = frontier
+        self.stats = stats
+        self.size = 0
+        self.pushedStates = set()
+
+    def push(self, item, *priority):
+        self._countPush(item)
+        start = time.time()
+        self.frontier.push(item, *priority)
+        self.stats.queueTime += time.time() - start
+        self._updateSize()
+
+    def update(self, item, priority):
+        self._countPush(item)
+        start = time.time()
+        self.frontier.update(item, priority)
+        self.stats.queueTime += time.time() - start
+        self._updateSize()
+
+    def pop(self):
+        start = time.time()
+        item = self.frontier.pop()
+        self.stats.queueTime += time.time() - start
+        self.stats.pops += 1
+        self._updateSize()
+        return item
+
+    def isEmpty(self):
+        return self.frontier.isEmpty()
+
+    def __getattr__(self, name):
+        return getattr(self.frontier, name)
+
+    def _countPush(self, item):
+        self.stats.pushes += 1
+        state = getattr(item, 'state', item)
+        if state in self.pushedStates:
+            self.stats.duplicatePushes += 1
+        else:
+            self.pushedStates.add(state)
+
+    def _updateSize(self):
+        # priority queues keep their entries in 'heap', stacks and queues in 'list'
+        if hasattr(self.frontier, 'heap'):
+            size = len(self.frontier.heap)
+        else:
+            size = len(self.frontier.list)
+        self.stats.frontierSize += size - self.size
+        self.size = size
+        self.stats.peakFrontier = max(self.stats.peakFrontier, self.stats.frontierSize)
+
+def instrumentFrontier(frontier, stats):
+    "Returns frontier wrapped to record into stats, or frontier itself if stats is None"
+    if stats is None:
+        return frontier
+    return InstrumentedFrontier(frontier, stats)
+
+def peakMemoryKB():
+    "Returns the peak resident memory of this process in kilobytes, or 0 if unknown"
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # macOS reports bytes rather than kilobytes
+        peak /= 1024
+    return peak
+
+def searchWithStats(searchFunction, problem, heuristic=None, **searchArgs):
+    """
+    Runs searchFunction on problem and returns (path, SearchStats).  The
+    heuristic, if any, is passed on as the 'heuristic' argument and any other
+    keyword arguments are passed on unchanged.
+    """
+    stats = SearchStats()
+    code = searchFunction.func_code
+    if 'stats' in code.co_varnames[:code.co_argcount]:
+        searchArgs['stats'] = stats
+    if heuristic is not None:
+        searchArgs['heuristic'] = instrumentHeuristic(heuristic, stats)
+
+    start = time.time()
+    path = searchFunction(InstrumentedProblem(problem, stats), **searchArgs)
+    stats.totalTime = time.time() - start
+    stats.peakMemoryKB = peakMemoryKB()
+    if path is not None and path != 0:
+        stats.pathLength = len(path)
+        stats.pathCost = problem.getCostOfActions(path)
+    return path, stats
+
+def recordingSearch(searchFunction, heuristic, searchArgs, statsFile, labels={}):
+    """
+    Returns a function from a problem to a path that runs searchWithStats and
+    appends the statistics, with the labels dict merged in, to statsFile as
+    one line of JSON.  This is what SearchAgent uses for -a statsFile=...
+    """
+    def search(problem):
+        path, stats = searchWithStats(searchFunction, problem, heuristic, **dict(searchArgs))
+        print('[SearchAgent] %s' % stats)
+        f = open(statsFile, 'a')
+        try:
+            f.write(stats.toJSON(**labels) + '\n')
+        finally:
+            f.close()
+        return path
+    return search
@@ -222,6 +222,130 @@ class PriorityQueueWithFunction(PriorityQueue):
         "Adds an item to the queue with priority from the priority function"
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
+class IndexedPriorityQueue:
+    """
+      A priority queue backed by a binary heap that also maps each queued
+      item to its position in the heap.  This gives O(log n) decrease-key
+      through update and O(1) membership tests, where PriorityQueue.update
+      has to scan the whole heap and then heapify it again.
+
+      Items are identified by key(item), which defaults to the item itself.
+      A search that queues nodes can pass key=lambda node: node.state so that
+      two nodes for the same state are treated as the same entry.
+
+      Ties between equal priorities are broken first-in-first-out, exactly as
+      in PriorityQueue.  An item whose priority is lowered by update is queued
+      behind the items that already share its new priority, as if it had just
+      been pushed.
+    """
+    def __init__(self, key=None):
+        self.heap = []
+        self.position = {}
+        self.count = 0
+        self.key = key
+
+    def push(self, item, priority):
+        "Adds an item, replacing the queued item with the same key if any"
+        key = self._keyOf(item)
+        entry = (priority, self.count, key, item)
+        self.count += 1
+        if key in self.position:
+            index = self.position[key]
+            old = self.heap[index]
+            self.heap[index] = entry
+            if entry < old:
+                self._siftUp(index)
+            else:
+                self._siftDown(index)
+        else:
+            self.heap.append(entry)
+            self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        "Removes and returns the lowest-priority item"
+        heap = self.heap
+        (_, _, key, item) = heap[0]
+        del self.position[key]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._siftDown(0)
+        return item
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def update(self, item, priority):
+        # If item already in priority queue with higher priority, lower its priority in place.
+        # If item already in priority queue with equal or lower priority, do nothing.
+        # If item not in priority queue, do the same thing as self.push.
+        key = self._keyOf(item)
+        if key in self.position:
+            index = self.position[key]
+            if self.heap[index][0] <= priority:
+                return
+            self.heap[index] = (priority, self.count, key, item)
+            self.count += 1
+            self._siftUp(index)
+        else:
+            self.push(item, priority)
+
+    def minPriority(self):
+        "Returns the lowest priority in the queue without removing its item"
+        return self.heap[0][0]
+
+    def getPriority(self, item):
+        "Returns the priority item is queued with, or None if it is not queued"
+        key = self._keyOf(item)
+        if key not in self.position:
+            return None
+        return self.heap[self.position[key]][0]
+
+    def __contains__(self, item):
+        return self._keyOf(item) in self.position
+
+    def __len__(self):
+        return len(self.heap)
+
+    def _keyOf(self, item):
+        if self.key is None:
+            return item
+        return self.key(item)
+
+    def _siftUp(self, index):
+        heap, position = self.heap, self.position
+        entry = heap[index]
+        while index > 0:
+            parentIndex = (index - 1) >> 1
+            parent = heap[parentIndex]
+            if not entry < parent:
+                break
+            heap[index] = parent
+            position[parent[2]] = index
+            index = parentIndex
+        heap[index] = entry
+        position[entry[2]] = index
+
+    def _siftDown(self, index):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            childIndex = 2 * index + 1
+            if childIndex >= size:
+                break
+            rightIndex = childIndex + 1
+            if rightIndex < size and heap[rightIndex] < heap[childIndex]:
+                childIndex = rightIndex
+            child = heap[childIndex]
+            if not child < entry:
+                break
+            heap[index] = child
+            position[child[2]] = index
+            index = childIndex
+        heap[index] = entry
+        position[entry[2]] = index
+
 
 def manhattanDistance( xy1, xy2 ):
     "Returns the Manhattan distance between points xy1 and xy2"
@@ -94,7 +94,7 @@ class SimpleExtractor(FeatureExtractor):
         if not features["#-of-ghosts-1-step-away"] and food[next_x][next_y]:
             features["eats-food"] = 1.0
 
-        dist = closestFood((next_x, next_y), food, walls)
+        dist = state.getFoodDistance((next_x, next_y))
         if dist is not None:
             # make the distance a number less than one otherwise the update
             # will diverge wildly
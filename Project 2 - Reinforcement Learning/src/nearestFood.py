@@ -0,0 +1,178 @@
+# nearestFood.py
+# --------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Maze distances to the nearest food, shared by all the states of a layout.
+
+GameState.getFoodDistance(pos) is the usual way in:
+
+> dist = state.getFoodDistance(state.getPacmanPosition())
+
+Each layout has one NearestFoodIndex holding the distance from every open
+cell to the nearest food of some state.  When it is asked about a different
+state, it follows the FoodToken (see game.py) of that state: if the state is
+the one it holds with a single food eaten, or the reverse, only the cells
+that were nearest to that food are recomputed.  Anything else (a new game, a
+state from an unrelated branch) rebuilds the whole index.
+"""
+
+from game import Actions
+import heapq
+
+UNREACHABLE = 1000000
+
+# One index per layout, keyed by the layout's text
+NEAREST_FOOD_INDICES = {}
+
+class NearestFoodIndex:
+    """
+    The maze distance from every open cell of a layout to the nearest food
+    of one food grid.  Every cell also remembers which food it is nearest
+    to, which is what allows food to be removed and added back cheaply.
+    """
+    def __init__(self, walls):
+        self.cellIds = {}
+        self.positions = walls.asList(False)
+        for cell, pos in enumerate(self.positions):
+            self.cellIds[pos] = cell
+        self.neighbors = []
+        for pos in self.positions:
+            self.neighbors.append([self.cellIds[n] for n in Actions.getLegalNeighbors(pos, walls)
+                                   if n != pos])
+        numCells = len(self.positions)
+        self.distance = [UNREACHABLE] * numCells
+        self.owner = [-1] * numCells
+        self.token = None
+        self.rebuilds = 0
+        self.updates = 0
+
+    def getDistance(self, data, pos):
+        """
+        Returns the maze distance from pos to the nearest food of the
+        GameStateData data, or None if pos is a wall or no food can be reached.
+        """
+        cell = self.cellIds.get(pos)
+        if cell is None:
+            return None
+        self.sync(data)
+        if self.distance[cell] == UNREACHABLE:
+            return None
+        return self.distance[cell]
+
+    def sync(self, data):
+        "Brings the index up to date with the food of the GameStateData data"
+        token = data.getFoodToken()
+        if token is self.token:
+            return
+        if self.token is not None and self.token.parent is token:
+            # Back to the food before the last one was eaten
+            self.addFood(self.token.eaten)
+        elif self.token is not None and token.parent is self.token:
+            self.removeFood(token.eaten)
+        elif self.token is not None and self.token.parent is not None and \
+                token.parent is self.token.parent:
+            # A sibling: the same food, but a different piece of it eaten
+            self.addFood(self.token.eaten)
+            self.removeFood(token.eaten)
+        else:
+            self.rebuild(data.food)
+            self.token = token
+            return
+        self.updates += 1
+        self.token = token
+
+    def rebuild(self, food):
+        "Recomputes every distance with a breadth first search from all the food at once"
+        self.rebuilds += 1
+        numCells = len(self.positions)
+        distance, owner, neighbors = [UNREACHABLE] * numCells, [-1] * numCells, self.neighbors
+        layer = []
+        for cell, (x, y) in enumerate(self.positions):
+            if food[x][y]:
+                distance[cell] = 0
+                owner[cell] = cell
+                layer.append(cell)
+        depth = 0
+        while layer:
+            depth += 1
+            nextLayer = []
+            for cell in layer:
+                for neighbor in neighbors[cell]:
+                    if owner[neighbor] < 0:
+                        distance[neighbor] = depth
+                        owner[neighbor] = owner[cell]
+                        nextLayer.append(neighbor)
+            layer = nextLayer
+        self.distance, self.owner = distance, owner
+
+    def addFood(self, pos):
+        "Adds food at pos, updating only the cells that are now nearer to it"
+        food = self.cellIds[pos]
+        neighbors, distance, owner = self.neighbors, self.distance, self.owner
+        distance[food] = 0
+        owner[food] = food
+        layer = [food]
+        depth = 0
+        while layer:
+            depth += 1
+            nextLayer = []
+            for cell in layer:
+                for neighbor in neighbors[cell]:
+                    if depth < distance[neighbor]:
+                        distance[neighbor] = depth
+                        owner[neighbor] = food
+                        nextLayer.append(neighbor)
+            layer = nextLayer
+
+    def removeFood(self, pos):
+        "Removes the food at pos and repairs the cells that were nearest to it"
+        food = self.cellIds[pos]
+        neighbors, distance, owner = self.neighbors, self.distance, self.owner
+
+        # The cells nearest to the removed food form a connected region around it
+        region = [food]
+        owner[food] = -1
+        for cell in region:
+            for neighbor in neighbors[cell]:
+                if owner[neighbor] == food:
+                    owner[neighbor] = -1
+                    region.append(neighbor)
+
+        # Seed the region from the intact cells bordering it, then spread the
+        # new distances through it in order
+        frontier = []
+        for cell in region:
+            distance[cell] = UNREACHABLE
+            for neighbor in neighbors[cell]:
+                if owner[neighbor] >= 0 and distance[neighbor] + 1 < distance[cell]:
+                    distance[cell] = distance[neighbor] + 1
+                    owner[cell] = owner[neighbor]
+            if owner[cell] >= 0:
+                heapq.heappush(frontier, (distance[cell], cell))
+        while frontier:
+            depth, cell = heapq.heappop(frontier)
+            if depth > distance[cell]:
+                continue
+            for neighbor in neighbors[cell]:
+                if depth + 1 < distance[neighbor]:
+                    distance[neighbor] = depth + 1
+                    owner[neighbor] = owner[cell]
+                    heapq.heappush(frontier, (depth + 1, neighbor))
+
+def getNearestFoodIndex(layout):
+    "Returns the NearestFoodIndex of a layout, built on first use and shared afterwards"
+    key = '\n'.join(layout.layoutText)
+    if key not in NEAREST_FOOD_INDICES:
+        NEAREST_FOOD_INDICES[key] = NearestFoodIndex(layout.walls)
+    return NEAREST_FOOD_INDICES[key]
@@ -43,9 +43,10 @@ from game import GameStateData
 from game import Game
 from game import Directions
 from game import Actions
+from game import FoodToken
 from util import nearestPoint
 from util import manhattanDistance
-import util, layout
+import util, layout, nearestFood
 import sys, types, time, random, os
 
 ###################################################
@@ -203,6 +204,19 @@ class GameState:
     def hasFood(self, x, y):
         return self.data.food[x][y]
 
+    def getFoodDistance(self, pos):
+        """
+        Returns the maze distance from pos to the closest food, or None if pos
+        is a wall or no food can be reached from it.
+
+        The distances are kept in an index shared by all the states of a
+        layout (see nearestFood.py) that is updated as food is eaten, so
+        asking about many positions, or about a state and its successors, is
+        cheap.
+        """
+        index = nearestFood.getNearestFoodIndex(self.data.layout)
+        return index.getDistance(self.data, pos)
+
     def hasWall(self, x, y):
         return self.data.layout.walls[x][y]
 
@@ -364,6 +378,7 @@ class PacmanRules:
             state.data.food = state.data.food.copy()
             state.data.food[x][y] = False
             state.data._foodEaten = position
+            state.data._foodToken = FoodToken( state.data.getFoodToken(), position )
             # TODO: cache numFood?
             numFood = state.getNumFood()
             if numFood == 0 and not state.data._lose:
@@ -131,8 +131,9 @@ def enhancedPacmanFeatures(state, action):
     maxValFood = sys.maxint #maxint for min
     maxValGhost = sys.maxint #maxint for min
 
-    for pellet in successorState.getFood().asList(): #get min distance to food
-        maxValFood = min(maxValFood, util.manhattanDistance(successorLocation, pellet)) #calculates min distance for food
+    foodDistance = successorState.getFoodDistance(successorLocation) #maze distance to the closest food
+    if foodDistance is not None:
+        maxValFood = foodDistance
 
     for successiveGhost in successorGhost: #get min distance to ghost
         maxValGhost = min (maxValGhost, util.manhattanDistance(successiveGhost, successorLocation)) #calculates min distance to ghost
@@ -14,6 +14,7 @@
 
 from util import manhattanDistance
 from game import Grid
+from game import BitGrid
 import os
 import random
 
@@ -28,7 +29,7 @@ class Layout:
         self.width = len(layoutText[0])
         self.height= len(layoutText)
         self.walls = Grid(self.width, self.height, False)
-        self.food = Grid(self.width, self.height, False)
+        self.food = BitGrid(self.width, self.height, False)
         self.capsules = []
         self.agentPositions = []
         self.numGhosts = 0